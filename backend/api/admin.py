@@ -1,24 +1,150 @@
+from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
 
 from .models import Favorite, Follow, Ingredient, Recipe, ShoppingList, Tag
 
 
-class RecipeAdmin(admin.ModelAdmin):
-    list_filter = ('author', 'name', 'tags')
-    list_display = ('name', 'followers')
+class EstimatedCountPaginator(Paginator):
 
-    @admin.display(empty_value=None)
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] > settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return int(row[0])
+        return super().count
+
+
+class AutocompleteFilter(admin.SimpleListFilter):
+    template = 'admin/autocomplete_filter.html'
+    field_name = None
+
+    def __init__(self, request, params, model, model_admin):
+        self.field = model._meta.get_field(self.field_name)
+        self.title = self.field.verbose_name
+        self.parameter_name = f'{self.field_name}__id__exact'
+        super().__init__(request, params, model, model_admin)
+        self.form_field = forms.ModelChoiceField(
+            queryset=self.field.remote_field.model._default_manager.all(),
+            required=False,
+            widget=AutocompleteSelect(self.field, model_admin.admin_site),
+        )
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.value() is None,
+            'query_string': changelist.get_query_string(
+                remove=[self.parameter_name]),
+            'display': _('All'),
+        }
+
+    @property
+    def widget_id(self):
+        return f'filter_{self.parameter_name}'
+
+    def rendered_widget(self):
+        return self.form_field.widget.render(
+            self.parameter_name, self.value(), attrs={'id': self.widget_id})
+
+
+def autocomplete_filter(field_name):
+    return type(f'{field_name.title()}Filter', (AutocompleteFilter, ),
+                {'field_name': field_name})
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @property
+    def media(self):
+        media = super().media
+        if any(isinstance(list_filter, type)
+               and issubclass(list_filter, AutocompleteFilter)
+               for list_filter in self.list_filter):
+            media += AutocompleteSelect(None, self.admin_site).media
+        return media
+
+
+class RecipeAdmin(LargeTableAdmin):
+    list_display = ('name', 'author', 'pub_date', 'followers')
+    list_filter = (autocomplete_filter('author'), autocomplete_filter('tags'))
+    list_select_related = ('author', )
+    search_fields = ('name', )
+    raw_id_fields = ('author', )
+    autocomplete_fields = ('tags', )
+
+    @admin.display(empty_value=None, ordering='favorites_count')
     def followers(self, obj):
-        return obj.favorite_recipe.all().count()
+        return obj.favorites_count
+
+
+class IngredientAdmin(LargeTableAdmin):
+    list_display = ('name', 'measurement_unit')
+    search_fields = ('^name', )
+
+
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'color', 'recipes_count')
+    search_fields = ('name', 'slug')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            recipes_count=Count('recipes'))
+
+    @admin.display(description='Количество рецептов',
+                   ordering='recipes_count')
+    def recipes_count(self, obj):
+        return obj.recipes_count
+
+
+class FollowAdmin(LargeTableAdmin):
+    list_display = ('user', 'author')
+    list_filter = (autocomplete_filter('user'), autocomplete_filter('author'))
+    list_select_related = ('user', 'author')
+    raw_id_fields = ('user', 'author')
+
+
+class UserRecipeAdmin(LargeTableAdmin):
+    list_display = ('user', 'recipe', 'pub_date')
+    list_filter = (autocomplete_filter('user'), autocomplete_filter('recipe'))
+    list_select_related = ('user', 'recipe')
+    raw_id_fields = ('user', 'recipe')
+
 
+class ShoppingListAdmin(UserRecipeAdmin):
 
-class IngredientAdmin(admin.ModelAdmin):
-    list_filter = ('name', )
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
-admin.site.register(Follow)
-admin.site.register(Tag)
+admin.site.register(Follow, FollowAdmin)
+admin.site.register(Tag, TagAdmin)
 admin.site.register(Ingredient, IngredientAdmin)
 admin.site.register(Recipe, RecipeAdmin)
-admin.site.register(Favorite)
-admin.site.register(ShoppingList)
+admin.site.register(Favorite, UserRecipeAdmin)
+admin.site.register(ShoppingList, ShoppingListAdmin)
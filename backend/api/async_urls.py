@@ -0,0 +1,17 @@
+from django.urls import path
+
+from . import async_views
+
+urlpatterns = [
+    path('recipes/', async_views.recipe_list, name='recipes-list'),
+    path('recipes/<int:pk>/', async_views.recipe_detail,
+         name='recipes-detail'),
+    path('tags/', async_views.tag_list, name='tags-list'),
+    path('tags/<int:pk>/', async_views.tag_detail, name='tags-detail'),
+    path('ingredients/', async_views.ingredient_list,
+         name='ingredients-list'),
+    path('ingredients/<int:pk>/', async_views.ingredient_detail,
+         name='ingredients-detail'),
+    path('users/subscriptions/', async_views.subscriptions,
+         name='users-subscriptions'),
+]
@@ -0,0 +1,50 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .views import (FollowViewSet, IngredientViewSet, RecipesViewSet,
+                    TagViewSet)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_READ_WORKERS,
+    thread_name_prefix='async-reads',
+)
+
+
+def render(view, request, *args, **kwargs):
+    try:
+        response = view(request, *args, **kwargs)
+        if callable(getattr(response, 'render', None)):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def offload(view):
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        context = contextvars.copy_context()
+        call = functools.partial(render, view, request, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, context.run, call)
+    return async_view
+
+
+recipe_list = offload(RecipesViewSet.as_view(
+    {'get': 'list', 'post': 'create'}))
+recipe_detail = offload(RecipesViewSet.as_view({
+    'get': 'retrieve',
+    'put': 'update',
+    'patch': 'partial_update',
+    'delete': 'destroy',
+}))
+tag_list = offload(TagViewSet.as_view({'get': 'list'}))
+tag_detail = offload(TagViewSet.as_view({'get': 'retrieve'}))
+ingredient_list = offload(IngredientViewSet.as_view({'get': 'list'}))
+ingredient_detail = offload(IngredientViewSet.as_view({'get': 'retrieve'}))
+subscriptions = offload(FollowViewSet.as_view({'get': 'subscriptions'}))
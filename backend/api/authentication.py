@@ -0,0 +1,96 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+
+class TokenCache:
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_cache = TokenCache(settings.AUTH_TOKEN_CACHE_MAX_SIZE,
+                         settings.AUTH_TOKEN_CACHE_TIMEOUT)
+
+
+def get_shared_cache():
+    if settings.AUTH_TOKEN_CACHE:
+        return caches[settings.AUTH_TOKEN_CACHE]
+    return None
+
+
+def shared_key(key):
+    return f'auth-token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def invalidate(*keys):
+    shared_cache = get_shared_cache()
+    for key in keys:
+        local_cache.delete(key)
+    if shared_cache is not None and keys:
+        shared_cache.delete_many([shared_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        shared_cache = get_shared_cache()
+        entry = local_cache.get(key)
+        if entry is None and shared_cache is not None:
+            entry = shared_cache.get(shared_key(key))
+            if entry is not None:
+                local_cache.set(key, entry)
+        if entry is None:
+            try:
+                token = self.get_model().objects.select_related(
+                    'user').get(key=key)
+            except self.get_model().DoesNotExist:
+                raise AuthenticationFailed(_('Invalid token.'))
+            entry = (token.user, token)
+            local_cache.set(key, entry)
+            if shared_cache is not None:
+                shared_cache.set(shared_key(key), entry,
+                                 settings.AUTH_TOKEN_CACHE_TIMEOUT)
+
+        user, token = entry
+        if not user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+        return copy.copy(user), token
@@ -0,0 +1,240 @@
+import io
+import random
+import statistics
+import time
+from collections import defaultdict
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from .models import (Favorite, Follow, Ingredient, IngredientInRecipe, Recipe,
+                     ShoppingList, Tag)
+from users.models import CustomUser
+
+INGREDIENT_WORDS = (
+    'мука', 'сахар', 'соль', 'молоко', 'масло', 'яйцо', 'рис', 'гречка',
+    'морковь', 'лук', 'чеснок', 'перец', 'сыр', 'творог', 'курица',
+    'говядина', 'картофель', 'капуста', 'томат', 'огурец',
+)
+
+
+def make_image():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), 'orange').save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue(), name='benchmark.png')
+
+
+def seed(users=50, recipes=500, ingredients=2000, tags=10, follows=10,
+         favorites=20, cart=10, seed=0):
+    rng = random.Random(seed)
+    CustomUser.objects.bulk_create(
+        CustomUser(username=f'bench{number}',
+                   email=f'bench{number}@example.com',
+                   first_name='Бенч', last_name=f'Марк{number}')
+        for number in range(users))
+    user_ids = list(CustomUser.objects.filter(
+        username__startswith='bench').values_list('id', flat=True))
+
+    Tag.objects.bulk_create(
+        Tag(name=f'Тег {number}', slug=f'tag{number}',
+            color=f'#{number:06x}')
+        for number in range(tags))
+    tag_ids = list(Tag.objects.values_list('id', flat=True))
+
+    Ingredient.objects.bulk_create(
+        Ingredient(name=f'{rng.choice(INGREDIENT_WORDS)} {number}',
+                   measurement_unit=rng.choice(('г', 'мл', 'шт')))
+        for number in range(ingredients))
+    ingredient_ids = list(Ingredient.objects.values_list('id', flat=True))
+
+    image = Recipe._meta.get_field('image')
+    image_name = image.storage.save(
+        image.generate_filename(None, 'benchmark.png'), make_image())
+    Recipe.objects.bulk_create(
+        Recipe(author_id=rng.choice(user_ids), name=f'Рецепт {number}',
+               text=f'Рецепт {number}: {rng.choice(INGREDIENT_WORDS)}',
+               cooking_time=rng.randint(5, 120), image=image_name)
+        for number in range(recipes))
+    recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+        for recipe_id in recipe_ids
+        for tag_id in rng.sample(tag_ids, min(len(tag_ids), 2)))
+    IngredientInRecipe.objects.bulk_create(
+        IngredientInRecipe(recipe_id=recipe_id, ingredient_id=ingredient_id,
+                           amount=rng.randint(1, 500))
+        for recipe_id in recipe_ids
+        for ingredient_id in rng.sample(ingredient_ids,
+                                        min(len(ingredient_ids), 8)))
+
+    for model, per_user, field, targets in (
+            (Follow, follows, 'author_id', user_ids),
+            (Favorite, favorites, 'recipe_id', recipe_ids),
+            (ShoppingList, cart, 'recipe_id', recipe_ids)):
+        model.objects.bulk_create(
+            model(user_id=user_id, **{field: target})
+            for user_id in user_ids
+            for target in rng.sample(targets, min(len(targets), per_user))
+            if target != user_id or model is not Follow)
+
+    call_command('reconcile_counters', stdout=io.StringIO())
+    call_command('rebuild_feed', stdout=io.StringIO())
+    call_command('rebuild_shopping_cart_totals', stdout=io.StringIO())
+
+
+class ClientTransport:
+    counts_queries = True
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, token=None):
+        headers = {}
+        if token:
+            headers['HTTP_AUTHORIZATION'] = f'Token {token}'
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(self.client, method.lower())(path, **headers)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, len(queries)
+
+
+class HttpTransport:
+    counts_queries = False
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+
+    def request(self, method, path, token=None):
+        request = Request(self.url + path, method=method)
+        if token:
+            request.add_header('Authorization', f'Token {token}')
+        started = time.perf_counter()
+        try:
+            with urlopen(request) as response:
+                response.read()
+                status = response.status
+        except HTTPError as error:
+            status = error.code
+        return status, time.perf_counter() - started, None
+
+
+class Context:
+
+    def __init__(self, rng):
+        self.rng = rng
+        user = CustomUser.objects.filter(
+            following__isnull=False, purchases__isnull=False,
+        ).order_by('id').first() or CustomUser.objects.order_by('id').first()
+        self.token = Token.objects.get_or_create(user=user)[0].key
+        self.recipe_ids = list(
+            Recipe.objects.values_list('id', flat=True)[:1000])
+        self.tag_slugs = list(Tag.objects.values_list('slug', flat=True))
+        self.ingredient_names = list(
+            Ingredient.objects.values_list('name', flat=True)[:1000])
+
+    def recipe_id(self):
+        return self.rng.choice(self.recipe_ids)
+
+    def tag_query(self):
+        slugs = self.rng.sample(self.tag_slugs, min(len(self.tag_slugs), 2))
+        return ''.join(f'&tags={slug}' for slug in slugs)
+
+
+def browse_feed(context):
+    yield 'GET', f'/api/recipes/?page=1&limit=6{context.tag_query()}', None
+    yield ('GET', f'/api/recipes/?page=1&limit=6{context.tag_query()}',
+           context.token)
+    yield 'GET', '/api/recipes/feed/?limit=6&cursor=', context.token
+
+
+def open_recipe(context):
+    yield 'GET', f'/api/recipes/{context.recipe_id()}/', None
+    yield 'GET', f'/api/recipes/{context.recipe_id()}/', context.token
+
+
+def toggle_favorite(context):
+    recipe_id = context.recipe_id()
+    yield 'GET', f'/api/recipes/{recipe_id}/favorite/', context.token
+    yield 'DELETE', f'/api/recipes/{recipe_id}/favorite/', context.token
+
+
+def autocomplete(context):
+    name = context.rng.choice(context.ingredient_names)
+    for length in range(1, min(len(name), 6) + 1):
+        yield 'GET', f'/api/ingredients/?name={name[:length]}', None
+
+
+def download_cart(context):
+    yield 'GET', '/api/recipes/download_shopping_cart/', context.token
+
+
+def view_subscriptions(context):
+    yield ('GET', '/api/users/subscriptions/?page=1&limit=6&recipes_limit=3',
+           context.token)
+
+
+SCENARIOS = {
+    'browse_feed': browse_feed,
+    'open_recipe': open_recipe,
+    'toggle_favorite': toggle_favorite,
+    'autocomplete': autocomplete,
+    'download_cart': download_cart,
+    'view_subscriptions': view_subscriptions,
+}
+
+
+def endpoint_name(method, path):
+    return f'{method} {resolve(path.split("?")[0]).url_name}'
+
+
+def run(transport, scenarios, iterations, seed=0):
+    context = Context(random.Random(seed))
+    results = defaultdict(lambda: {'timings': [], 'queries': [],
+                                   'errors': 0})
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for scenario in scenarios:
+            for method, path, token in SCENARIOS[scenario](context):
+                status, elapsed, queries = transport.request(
+                    method, path, token)
+                result = results[endpoint_name(method, path)]
+                result['timings'].append(elapsed)
+                if queries is not None:
+                    result['queries'].append(queries)
+                if status >= 500:
+                    result['errors'] += 1
+    return results, time.perf_counter() - started
+
+
+def percentile(timings, value):
+    return timings[min(len(timings) - 1, int(len(timings) * value))]
+
+
+def summarize(results):
+    summary = {}
+    for name, result in sorted(results.items()):
+        timings = sorted(result['timings'])
+        summary[name] = {
+            'requests': len(timings),
+            'errors': result['errors'],
+            'p50': percentile(timings, 0.5) * 1000,
+            'p95': percentile(timings, 0.95) * 1000,
+            'p99': percentile(timings, 0.99) * 1000,
+            'throughput': len(timings) / sum(timings),
+            'queries': max(result['queries'], default=None),
+            'mean_queries': (statistics.mean(result['queries'])
+                             if result['queries'] else None),
+        }
+    return summary
@@ -0,0 +1,85 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+HITS_KEY = 'recipes-cache-hits'
+MISSES_KEY = 'recipes-cache-misses'
+
+
+def incr(key, initial=0, timeout=None):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, initial, timeout=timeout)
+        return cache.incr(key)
+
+
+def get_stamp(name):
+    keys = (f'{name}-version', f'{name}-modified')
+    values = cache.get_many(keys)
+    if len(values) < len(keys):
+        now = time.time()
+        timeout = settings.CACHE_STAMP_TIMEOUT
+        cache.add(keys[0], int(now * 1000), timeout=timeout)
+        cache.add(keys[1], now, timeout=timeout)
+        values = {**cache.get_many(keys)}
+        values.setdefault(keys[0], int(now * 1000))
+        values.setdefault(keys[1], now)
+    return (values[keys[0]],
+            datetime.fromtimestamp(values[keys[1]], tz=timezone.utc))
+
+
+def touch(name):
+    now = time.time()
+    incr(f'{name}-version', initial=int(now * 1000),
+         timeout=settings.CACHE_STAMP_TIMEOUT)
+    cache.set(f'{name}-modified', now, timeout=settings.CACHE_STAMP_TIMEOUT)
+
+
+def get_data_version():
+    return get_stamp('recipes')[0]
+
+
+def bump_data_version():
+    touch('recipes')
+
+
+def make_key(request, version):
+    query = urlencode(sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    ))
+    url = f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+    return f'recipes:{version}:{hashlib.sha256(url.encode()).hexdigest()}'
+
+
+def get_stats():
+    return {
+        'hits': cache.get(HITS_KEY, 0),
+        'misses': cache.get(MISSES_KEY, 0),
+        'version': get_data_version(),
+    }
+
+
+def cached_response(request, render):
+    key = make_key(request, get_data_version())
+    data = cache.get(key)
+    if data is not None:
+        incr(HITS_KEY)
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    incr(MISSES_KEY)
+    response = render()
+    if response.status_code == status.HTTP_200_OK:
+        cache.set(key, response.data, settings.RECIPES_CACHE_TIMEOUT)
+    response['X-Cache'] = 'MISS'
+    return response
@@ -0,0 +1,64 @@
+from django.db import connection
+
+from .models import IngredientInRecipe, ShoppingCartTotal, ShoppingList
+
+
+def quote_table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def upsert(select):
+    table = quote_table(ShoppingCartTotal)
+    return (f'INSERT INTO {table} (user_id, ingredient_id, amount) {select} '
+            f'ON CONFLICT (user_id, ingredient_id) '
+            f'DO UPDATE SET amount = {table}.amount + EXCLUDED.amount')
+
+
+def add_recipes(user_id, recipe_ids, sign=1):
+    if not recipe_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            upsert(f'SELECT %s, ingredient_id, SUM(amount) * %s '
+                   f'FROM {quote_table(IngredientInRecipe)} '
+                   f'WHERE recipe_id IN ({placeholders(recipe_ids)}) '
+                   f'GROUP BY ingredient_id'),
+            [user_id, sign, *recipe_ids])
+    ShoppingCartTotal.objects.filter(user_id=user_id, amount__lte=0).delete()
+
+
+def change_recipe(recipe_id, deltas):
+    deltas = {ingredient_id: delta for ingredient_id, delta in deltas.items()
+              if delta}
+    customers = ShoppingList.objects.filter(recipe_id=recipe_id)
+    if not deltas or not customers.exists():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            upsert(f'SELECT user_id, %s, %s '
+                   f'FROM {quote_table(ShoppingList)} WHERE recipe_id = %s'),
+            [(ingredient_id, delta, recipe_id)
+             for ingredient_id, delta in deltas.items()])
+    ShoppingCartTotal.objects.filter(
+        user__in=customers.values('user_id'), ingredient_id__in=list(deltas),
+        amount__lte=0,
+    ).delete()
+
+
+def rebuild(user_ids):
+    ShoppingCartTotal.objects.filter(user_id__in=user_ids).delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote_table(ShoppingCartTotal)} '
+            f'(user_id, ingredient_id, amount) '
+            f'SELECT cart.user_id, item.ingredient_id, SUM(item.amount) '
+            f'FROM {quote_table(ShoppingList)} cart '
+            f'INNER JOIN {quote_table(IngredientInRecipe)} item '
+            f'ON item.recipe_id = cart.recipe_id '
+            f'WHERE cart.user_id IN ({placeholders(user_ids)}) '
+            f'GROUP BY cart.user_id, item.ingredient_id',
+            list(user_ids))
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from .cache import get_stamp
+
+
+def get_conditional_stamp(request, names, per_user):
+    stamp = getattr(request, '_conditional_stamp', None)
+    if stamp is not None:
+        return stamp
+
+    names = list(names)
+    if per_user:
+        user = request.user
+        names.append('anonymous' if user.is_anonymous else f'user-{user.id}')
+    parts, last_modified = [], None
+    for name in names:
+        if name == 'anonymous':
+            parts.append(name)
+            continue
+        version, modified = get_stamp(name)
+        parts.append(f'{name}.{version}')
+        last_modified = max(last_modified or modified, modified)
+
+    request._conditional_stamp = ('"{}"'.format('-'.join(parts)),
+                                  last_modified)
+    return request._conditional_stamp
+
+
+def conditional(*names, per_user=False, name=''):
+    def etag(request, *args, **kwargs):
+        return get_conditional_stamp(request, names, per_user)[0]
+
+    def last_modified(request, *args, **kwargs):
+        return get_conditional_stamp(request, names, per_user)[1]
+
+    def decorator(view):
+        conditional_view = condition(
+            etag_func=etag, last_modified_func=last_modified)(view)
+
+        def wrapped(request, *args, **kwargs):
+            if not settings.CACHE_IS_SHARED:
+                return view(request, *args, **kwargs)
+            response = conditional_view(request, *args, **kwargs)
+            etag = response.get('ETag', '')
+            if response.has_header('Content-Encoding') and etag[:1] == '"':
+                response['ETag'] = f'W/{etag}'
+            if per_user:
+                patch_vary_headers(response, ('Authorization', ))
+            return response
+        return wrapped
+
+    return method_decorator(decorator, name=name)
@@ -0,0 +1,122 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, FilteredRelation, Q
+
+from .models import FeedEntry, Follow, Recipe
+from users.models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.FEED_WORKERS,
+    thread_name_prefix='feed',
+)
+
+
+def is_fanout_tier(followers_count):
+    return followers_count <= settings.FEED_FANOUT_MAX_FOLLOWERS
+
+
+def is_fanout_author(author_id):
+    return CustomUser.objects.filter(
+        id=author_id,
+        followers_count__lte=settings.FEED_FANOUT_MAX_FOLLOWERS,
+    ).exists()
+
+
+def deliver(entries):
+    entries = iter(entries)
+    while True:
+        batch = list(islice(entries, settings.FEED_BATCH_SIZE))
+        if not batch:
+            return
+        FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def fan_out(recipe_id):
+    recipe = Recipe.objects.filter(id=recipe_id).values(
+        'author_id', 'pub_date').first()
+    if recipe is None or not is_fanout_author(recipe['author_id']):
+        return
+    followers = Follow.objects.filter(
+        author_id=recipe['author_id']).values_list('user_id', flat=True)
+    deliver(FeedEntry(user_id=user_id, recipe_id=recipe_id,
+                      pub_date=recipe['pub_date'])
+            for user_id in followers.iterator())
+
+
+def backfill(user_id, author_id):
+    if not is_fanout_author(author_id):
+        return
+    recipes = Recipe.objects.filter(author_id=author_id).values_list(
+        'id', 'pub_date')[:settings.FEED_BACKFILL_SIZE]
+    deliver(FeedEntry(user_id=user_id, recipe_id=recipe_id, pub_date=pub_date)
+            for recipe_id, pub_date in recipes)
+
+
+def backfill_followers(author_id):
+    if not is_fanout_author(author_id):
+        return
+    recipes = list(Recipe.objects.filter(author_id=author_id).values_list(
+        'id', 'pub_date')[:settings.FEED_BACKFILL_SIZE])
+    followers = Follow.objects.filter(
+        author_id=author_id).values_list('user_id', flat=True)
+    deliver(FeedEntry(user_id=user_id, recipe_id=recipe_id, pub_date=pub_date)
+            for user_id in followers.iterator()
+            for recipe_id, pub_date in recipes)
+
+
+def dropped_to_fanout(author_id):
+    return CustomUser.objects.filter(
+        id=author_id,
+        followers_count=settings.FEED_FANOUT_MAX_FOLLOWERS,
+    ).exists()
+
+
+def run(task, *args):
+    close_old_connections()
+    try:
+        task(*args)
+    except Exception:
+        logger.exception('Не удалось обновить ленты: %s%r',
+                         task.__name__, args)
+    finally:
+        close_old_connections()
+
+
+def schedule(task, *args):
+    transaction.on_commit(lambda: executor.submit(run, task, *args))
+
+
+def trim(user_id, author_id):
+    FeedEntry.objects.filter(
+        user_id=user_id, recipe__author_id=author_id).delete()
+
+
+def get_feed(user, queryset=None):
+    if queryset is None:
+        queryset = Recipe.objects.all()
+    queryset = queryset.annotate(
+        entry=FilteredRelation(
+            'feed_entries', condition=Q(feed_entries__user=user)),
+    ).annotate(
+        entry_pub_date=F('entry__pub_date'),
+        entry_recipe_id=F('entry__recipe_id'),
+    )
+    pulled_authors = Follow.objects.filter(
+        user=user,
+        author__followers_count__gt=settings.FEED_FANOUT_MAX_FOLLOWERS,
+    ).values('author')
+    if not pulled_authors.exists():
+        ordering = ('entry_pub_date', 'entry_recipe_id')
+        queryset = queryset.filter(entry_recipe_id__isnull=False)
+    else:
+        ordering = ('pub_date', 'id')
+        queryset = queryset.filter(
+            Q(entry_recipe_id__isnull=False)
+            | Q(author__in=pulled_authors))
+    return queryset.order_by(*(f'-{field}' for field in ordering)), ordering
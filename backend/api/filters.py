@@ -1,18 +1,42 @@
 import django_filters as filters
+from django_filters import fields
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+from rest_framework.filters import BaseFilterBackend
 
-from .models import Ingredient, Recipe
+from .cache import get_stamp
+from .models import Favorite, Recipe, ShoppingList, Tag
+from .search import search_recipes
 
 
-class IngredientFilter(filters.FilterSet):
-    name = filters.CharFilter(field_name='name', lookup_expr='startswith')
+def get_tag_map(slugs=()):
+    version, _ = get_stamp('tags')
+    key = f'tags:{version}:map'
+    tag_map = cache.get(key)
+    if tag_map is None or not set(slugs) <= tag_map.keys():
+        tag_map = dict(Tag.objects.values_list('slug', 'id'))
+        cache.set(key, tag_map, timeout=None)
+    return tag_map
 
-    class Meta:
-        model = Ingredient
-        fields = ('name', )
+
+def get_tag_choices():
+    return [(slug, slug) for slug in get_tag_map()]
+
+
+class TagSlugsField(fields.MultipleChoiceField):
+
+    def validate(self, value):
+        get_tag_map(value)
+        super().validate(value)
+
+
+class TagSlugsFilter(filters.MultipleChoiceFilter):
+    field_class = TagSlugsField
 
 
 class RecipeFilter(filters.FilterSet):
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    tags = TagSlugsFilter(choices=get_tag_choices, method='get_tags')
+    author = filters.NumberFilter(field_name='author')
     is_favorited = filters.BooleanFilter(method='get_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
         method='get_is_in_shopping_cart')
@@ -21,14 +45,39 @@ class RecipeFilter(filters.FilterSet):
         model = Recipe
         fields = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart')
 
-    def get_is_favorited(self, queryset, name, value):
+    def get_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        tag_map = get_tag_map()
+        return queryset.filter(Exists(Recipe.tags.through.objects.filter(
+            recipe=OuterRef('pk'),
+            tag__in=[tag_map[slug] for slug in value],
+        )))
+
+    def filter_by_user(self, queryset, value, annotation, model):
         user = self.request.user
-        if value:
-            return Recipe.objects.filter(favorite_recipe__user=user)
-        return Recipe.objects.all()
+        if not value:
+            return queryset
+        if user.is_anonymous:
+            return queryset.none()
+        if annotation in queryset.query.annotations:
+            return queryset.filter(**{annotation: True})
+        return queryset.filter(Exists(model.objects.filter(
+            user=user, recipe=OuterRef('pk'))))
+
+    def get_is_favorited(self, queryset, name, value):
+        return self.filter_by_user(queryset, value, 'is_favorited', Favorite)
 
     def get_is_in_shopping_cart(self, queryset, name, value):
-        user = self.request.user
-        if value:
-            return Recipe.objects.filter(customers__user=user)
-        return Recipe.objects.all()
+        return self.filter_by_user(
+            queryset, value, 'is_in_shopping_cart', ShoppingList)
+
+
+class RecipeSearchFilter(BaseFilterBackend):
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_recipes(queryset, query)
@@ -0,0 +1,99 @@
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .cache import bump_data_version
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.RECIPE_IMAGE_WORKERS,
+    thread_name_prefix='recipe-images',
+)
+
+
+def get_storage():
+    return Recipe._meta.get_field('image').storage
+
+
+def variant_name(name, width, extension):
+    root, _ = os.path.splitext(name)
+    return f'{root}_{width}w.{extension}'
+
+
+def variant_names(name):
+    return [variant_name(name, width, extension)
+            for width in settings.RECIPE_IMAGE_WIDTHS
+            for extension in FORMATS]
+
+
+def generate_variants(name, force=False):
+    storage = get_storage()
+    if not force and all(storage.exists(path)
+                         for path in variant_names(name)):
+        return
+    with storage.open(name, 'rb') as file:
+        original = ImageOps.exif_transpose(Image.open(file))
+        original.load()
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA' if 'A' in original.getbands()
+                                    else 'RGB')
+
+    for width in settings.RECIPE_IMAGE_WIDTHS:
+        image = original.copy()
+        image.thumbnail((width, width * 4), Image.LANCZOS)
+        for extension, (image_format, params) in FORMATS.items():
+            variant = image
+            if image_format == 'JPEG' and variant.mode != 'RGB':
+                variant = variant.convert('RGB')
+            buffer = io.BytesIO()
+            variant.save(buffer, image_format, **params)
+            storage.replace(variant_name(name, width, extension),
+                            ContentFile(buffer.getvalue()))
+
+
+def process_recipe_image(recipe_id, name):
+    close_old_connections()
+    try:
+        generate_variants(name)
+        if Recipe.objects.filter(id=recipe_id, image=name).update(
+                has_image_variants=True):
+            bump_data_version()
+    except Exception:
+        logger.exception('Не удалось обработать изображение %s', name)
+    finally:
+        close_old_connections()
+
+
+def schedule(recipe):
+    recipe_id, name = recipe.id, recipe.image.name
+    transaction.on_commit(
+        lambda: executor.submit(process_recipe_image, recipe_id, name))
+
+
+def get_srcset(recipe, request=None):
+    if not recipe.image or not recipe.has_image_variants:
+        return None
+    srcset = {}
+    for extension in FORMATS:
+        urls = []
+        for width in settings.RECIPE_IMAGE_WIDTHS:
+            url = get_storage().url(
+                variant_name(recipe.image.name, width, extension))
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls.append(f'{url} {width}w')
+        srcset[extension] = ', '.join(urls)
+    return srcset
@@ -0,0 +1,65 @@
+import threading
+from bisect import bisect_left
+
+from django.conf import settings
+
+from .cache import get_stamp, touch
+from .models import Ingredient
+
+
+def normalize(name):
+    return name.lower().replace('ё', 'е')
+
+
+class IngredientIndex:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._index = ([], [])
+
+    def _build(self):
+        rows = Ingredient.objects.values_list('id', 'name', 'measurement_unit')
+        entries = sorted((
+            (normalize(name), {'id': id_, 'name': name,
+                               'measurement_unit': measurement_unit})
+            for id_, name, measurement_unit in rows.iterator()
+        ), key=lambda entry: (entry[0], entry[1]['id']))
+        self._index = ([key for key, _ in entries],
+                       [item for _, item in entries])
+
+    def _ensure_current(self):
+        version, _ = get_stamp('ingredients')
+        if version == self._version:
+            return
+        with self._lock:
+            if version != self._version:
+                self._build()
+                self._version = version
+
+    def search(self, query, limit=None):
+        limit = limit or settings.INGREDIENT_SEARCH_LIMIT
+        self._ensure_current()
+        keys, items = self._index
+        query = normalize(query)
+
+        result = []
+        position = bisect_left(keys, query)
+        while (position < len(keys) and len(result) < limit
+               and keys[position].startswith(query)):
+            result.append(items[position])
+            position += 1
+
+        for key, item in zip(keys, items):
+            if len(result) >= limit:
+                break
+            if query in key and not key.startswith(query):
+                result.append(item)
+        return result
+
+
+def invalidate():
+    touch('ingredients')
+
+
+ingredient_index = IngredientIndex()
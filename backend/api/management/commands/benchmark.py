@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (override_settings, setup_test_environment,
+                               teardown_test_environment)
+
+from api import benchmark
+
+BUDGETS_PATH = os.path.join(os.path.dirname(benchmark.__file__),
+                            'query_budgets.json')
+
+
+class Command(BaseCommand):
+    help = ('Заполняет тестовую базу и прогоняет типовые сценарии, '
+            'выводя задержки, пропускную способность и число SQL-запросов')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario', action='append', choices=benchmark.SCENARIOS,
+            dest='scenarios', help='Сценарий; по умолчанию все')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--recipes', type=int, default=500)
+        parser.add_argument('--ingredients', type=int, default=2000)
+        parser.add_argument('--tags', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--url', help='Нагружать запущенный сервер с текущей базой '
+                          'вместо тестового клиента')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Завершиться с ошибкой, если эндпоинт превысил '
+                 'записанный бюджет SQL-запросов или быстрый сериализатор '
+                 'рецептов разошёлся с RecipeSerializer')
+        parser.add_argument(
+            '--record', action='store_true',
+            help='Записать наблюдаемое число запросов как новый бюджет')
+
+    def handle(self, *args, **options):
+        scenarios = options['scenarios'] or list(benchmark.SCENARIOS)
+        if options['url']:
+            if options['check'] or options['record']:
+                raise CommandError(
+                    'Бюджеты запросов проверяются только тестовым клиентом')
+            results, elapsed = benchmark.run(
+                benchmark.HttpTransport(options['url']), scenarios,
+                options['iterations'], options['seed'])
+            self.report(benchmark.summarize(results), elapsed)
+            return
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True)
+        try:
+            with tempfile.TemporaryDirectory() as media_root:
+                with override_settings(MEDIA_ROOT=media_root):
+                    cache.clear()
+                    benchmark.seed(
+                        users=options['users'], recipes=options['recipes'],
+                        ingredients=options['ingredients'],
+                        tags=options['tags'], seed=options['seed'])
+                    results, elapsed = benchmark.run(
+                        benchmark.ClientTransport(), scenarios,
+                        options['iterations'], options['seed'])
+                    if options['check']:
+                        call_command('compare_recipe_serializers',
+                                     repeat=1, stdout=self.stdout)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        summary = benchmark.summarize(results)
+        self.report(summary, elapsed)
+        if options['record']:
+            self.record_budgets(summary)
+        if options['check']:
+            self.check_budgets(summary)
+
+    def report(self, summary, elapsed):
+        self.stdout.write(
+            f'{"Эндпоинт":<40}{"запр.":>7}{"p50":>9}{"p95":>9}{"p99":>9}'
+            f'{"запр./с":>10}{"SQL":>6}')
+        for name, row in summary.items():
+            queries = '-' if row['queries'] is None else row['queries']
+            self.stdout.write(
+                f'{name:<40}{row["requests"]:>7}{row["p50"]:>9.1f}'
+                f'{row["p95"]:>9.1f}{row["p99"]:>9.1f}'
+                f'{row["throughput"]:>10.1f}{queries:>6}')
+        total = sum(row['requests'] for row in summary.values())
+        errors = sum(row['errors'] for row in summary.values())
+        self.stdout.write(
+            f'Всего запросов: {total}, ошибок 5xx: {errors}, '
+            f'{total / elapsed:.1f} запр./с')
+
+    def record_budgets(self, summary):
+        with open(BUDGETS_PATH, 'w', encoding='utf-8') as file:
+            json.dump({name: row['queries'] for name, row in summary.items()},
+                      file, ensure_ascii=False, indent=4, sort_keys=True)
+            file.write('\n')
+        self.stdout.write(self.style.SUCCESS(
+            f'Бюджеты записаны в {BUDGETS_PATH}'))
+
+    def check_budgets(self, summary):
+        with open(BUDGETS_PATH, encoding='utf-8') as file:
+            budgets = json.load(file)
+        exceeded = [
+            f'{name}: {row["queries"]} SQL-запросов при бюджете '
+            f'{budgets[name]}'
+            for name, row in summary.items()
+            if name in budgets and row['queries'] > budgets[name]
+        ]
+        errors = [f'{name}: {row["errors"]} ответов 5xx'
+                  for name, row in summary.items() if row['errors']]
+        if exceeded or errors:
+            raise CommandError('\n'.join(exceeded + errors))
+        self.stdout.write(self.style.SUCCESS('Бюджеты запросов соблюдены'))
@@ -0,0 +1,74 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count
+
+from api.feed import get_feed
+from api.models import FeedEntry, Follow, Recipe
+from users.models import CustomUser
+
+
+def fan_out_on_read(user):
+    return Recipe.objects.filter(
+        author__in=Follow.objects.filter(user=user).values('author'),
+    ).order_by('-pub_date', '-id')
+
+
+def fan_out_on_write(user):
+    queryset, _ = get_feed(user)
+    return queryset
+
+
+STRATEGIES = {
+    'fan-out on write': fan_out_on_write,
+    'fan-out on read': fan_out_on_read,
+}
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает чтение ленты из предрассчитанной таблицы '
+            'и сборку ленты при чтении')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50,
+                            help='Сколько подписчиков взять в выборку')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Сколько раз читать ленту каждого')
+        parser.add_argument('--limit', type=int, default=10,
+                            help='Размер страницы ленты')
+        parser.add_argument('--explain', action='store_true',
+                            help='Показать планы запросов')
+
+    def handle(self, *args, **options):
+        users = list(CustomUser.objects.filter(
+            id__in=Follow.objects.values('user'),
+        ).order_by('?')[:options['users']])
+        if not users:
+            self.stdout.write('Нет пользователей с подписками')
+            return
+
+        for name, strategy in STRATEGIES.items():
+            timings = []
+            for user in users:
+                queryset = strategy(user).values_list('id', flat=True)
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    list(queryset[:options['limit']])
+                    timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f'{name}: среднее {statistics.mean(timings):.2f} мс, '
+                f'p95 {timings[int(len(timings) * 0.95) - 1]:.2f} мс')
+            if options['explain']:
+                self.stdout.write(strategy(users[0])[
+                    :options['limit']].explain())
+
+        followers = CustomUser.objects.filter(
+            recipes_count__gt=0).aggregate(average=Avg('followers_count'))
+        timelines = FeedEntry.objects.values('user').annotate(
+            total=Count('id')).aggregate(average=Avg('total'))
+        self.stdout.write(
+            f'Записей на одну публикацию (среднее число подписчиков '
+            f'автора): {followers["average"] or 0:.1f}; '
+            f'средняя длина ленты: {timelines["average"] or 0:.1f}')
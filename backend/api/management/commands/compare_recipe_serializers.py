@@ -0,0 +1,82 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import Recipe
+from api.serializers import RecipeCardSerializer, RecipeSerializer
+from users.models import CustomUser
+
+SERIALIZERS = (RecipeSerializer, RecipeCardSerializer)
+
+
+class Command(BaseCommand):
+    help = ('Проверяет, что RecipeCardSerializer выдаёт тот же JSON, что и '
+            'RecipeSerializer, и сравнивает время сериализации')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100,
+                            help='Количество рецептов в выборке')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Количество повторов замера')
+        parser.add_argument(
+            '--user', type=int, action='append', dest='users',
+            help='id пользователя, от имени которого сравнивать ответы; '
+                 'по умолчанию аноним и первый пользователь с корзиной')
+
+    def handle(self, *args, **options):
+        if options['users']:
+            viewers = list(CustomUser.objects.filter(id__in=options['users']))
+        else:
+            viewers = [AnonymousUser()]
+            user = CustomUser.objects.filter(
+                purchases__isnull=False).order_by('id').first()
+            if user is not None:
+                viewers.append(user)
+
+        for viewer in viewers:
+            request = Request(APIRequestFactory().get('/api/recipes/'))
+            request.user = viewer
+            context = {'request': request}
+            recipes = list(Recipe.objects.for_user(viewer).order_by(
+                '-pub_date', '-id')[:options['limit']])
+            if not recipes:
+                raise CommandError('Нет рецептов для сравнения')
+
+            self.compare(recipes, context)
+            timings = [self.measure(serializer, recipes, context,
+                                    options['repeat'])
+                       for serializer in SERIALIZERS]
+            self.stdout.write(
+                f'{viewer}: {len(recipes)} рецептов, на 100 рецептов '
+                f'{SERIALIZERS[0].__name__} {timings[0]:.1f} мс, '
+                f'{SERIALIZERS[1].__name__} {timings[1]:.1f} мс, '
+                f'ускорение в {timings[0] / timings[1]:.1f} раза')
+        self.stdout.write(self.style.SUCCESS('Ответы совпадают побайтно'))
+
+    def compare(self, recipes, context):
+        renderer = JSONRenderer()
+        for recipe in recipes:
+            expected, actual = (
+                renderer.render(serializer(recipe, context=context).data)
+                for serializer in SERIALIZERS)
+            if expected != actual:
+                raise CommandError(
+                    f'Рецепт {recipe.id}: ответы различаются\n'
+                    f'{expected.decode()}\n{actual.decode()}')
+        expected, actual = (
+            renderer.render(serializer(recipes, many=True,
+                                       context=context).data)
+            for serializer in SERIALIZERS)
+        if expected != actual:
+            raise CommandError('Списки рецептов различаются')
+
+    def measure(self, serializer, recipes, context, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            serializer(recipes, many=True, context=context).data
+        elapsed = time.perf_counter() - started
+        return elapsed / repeat / len(recipes) * 100 * 1000
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+
+from api.models import ShoppingList
+
+
+class Command(BaseCommand):
+    help = 'Удаляет повторные рецепты из списков покупок'
+
+    def handle(self, *args, **options):
+        first = ShoppingList.objects.values('user', 'recipe').annotate(
+            first_id=Min('id')).values('first_id')
+        deleted, _ = ShoppingList.objects.exclude(id__in=first).delete()
+        self.stdout.write(self.style.SUCCESS(f'Удалено повторов: {deleted}'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import bump_data_version
+from api.images import generate_variants
+from api.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии фотографий рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать копии и для уже обработанных рецептов')
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(image='')
+        if not options['force']:
+            recipes = recipes.filter(has_image_variants=False)
+
+        done = failed = 0
+        names = recipes.order_by('image').values_list(
+            'image', flat=True).distinct()
+        for name in names.iterator():
+            try:
+                generate_variants(name, force=options['force'])
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stderr.write(f'{name}: {error}')
+                continue
+            Recipe.objects.filter(image=name).update(has_image_variants=True)
+            done += 1
+
+        if done:
+            bump_data_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано фото: {done}, с ошибками: {failed}'))
@@ -0,0 +1,195 @@
+import csv
+import io
+import json
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api import ingredient_index
+from api.cache import bump_data_version
+from api.models import Ingredient
+
+READ_SIZE = 64 * 1024
+NAME_LENGTH = Ingredient._meta.get_field('name').max_length
+UNIT_LENGTH = Ingredient._meta.get_field('measurement_unit').max_length
+
+
+def read_csv(file):
+    for row in csv.reader(file):
+        if len(row) >= 2:
+            yield row[0], row[1]
+
+
+def read_json(file):
+    decoder = json.JSONDecoder()
+    buffer, started, position = '', False, 0
+    while True:
+        chunk = file.read(READ_SIZE)
+        buffer += chunk
+        while True:
+            buffer = buffer.lstrip()
+            if not started:
+                if not buffer:
+                    break
+                if buffer[0] != '[':
+                    raise CommandError('JSON-файл должен содержать массив')
+                buffer, started = buffer[1:], True
+                continue
+            buffer = buffer.lstrip(', \t\r\n')
+            if buffer.startswith(']'):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except ValueError:
+                break
+            position += 1
+            if not isinstance(item, dict) or not all(
+                    isinstance(item.get(key), str)
+                    for key in ('title', 'dimension')):
+                raise CommandError(
+                    f'Элемент {position}: ожидается объект со строковыми '
+                    f'полями title и dimension, получено {item!r}')
+            yield item['title'], item['dimension']
+            buffer = buffer[end:]
+        if not chunk:
+            raise CommandError('Неожиданный конец JSON-файла')
+
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json,
+}
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = 'Загружает ингредиенты из CSV- или JSON-файла'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу с ингредиентами')
+        parser.add_argument(
+            '--format', choices=READERS, dest='file_format',
+            help='Формат файла; по умолчанию определяется по расширению')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Количество строк в одной пачке')
+        parser.add_argument(
+            '--skip-existing', action='store_true',
+            help='Не обновлять единицы измерения существующих ингредиентов')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только прочитать и проверить файл, ничего не записывая')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = (options['file_format']
+                       or os.path.splitext(path)[1].lstrip('.').lower())
+        if file_format not in READERS:
+            raise CommandError(f'Неизвестный формат файла: {path}')
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size должен быть больше нуля')
+
+        self.skipped = 0
+        started = time.monotonic()
+        with open(path, encoding='utf-8', newline='') as file:
+            rows = self.clean(READERS[file_format](file))
+            if options['dry_run']:
+                total = sum(1 for _ in rows)
+                written = 0
+            else:
+                with transaction.atomic():
+                    if connection.vendor == 'postgresql':
+                        total, written = self.load_postgresql(rows, **options)
+                    else:
+                        total, written = self.load_orm(rows, **options)
+                ingredient_index.invalidate()
+                bump_data_version()
+        elapsed = time.monotonic() - started
+
+        rate = total / elapsed if elapsed else total
+        self.stdout.write(self.style.SUCCESS(
+            f'Прочитано строк: {total}, записано: {written}, '
+            f'пропущено некорректных: {self.skipped}. '
+            f'{elapsed:.2f} с, {rate:.0f} строк/с'
+            + (' (пробный запуск)' if options['dry_run'] else '')
+        ))
+
+    def clean(self, rows):
+        for name, measurement_unit in rows:
+            name, measurement_unit = name.strip(), measurement_unit.strip()
+            if (not name or not measurement_unit
+                    or len(name) > NAME_LENGTH
+                    or len(measurement_unit) > UNIT_LENGTH):
+                self.skipped += 1
+                continue
+            yield name, measurement_unit
+
+    def load_postgresql(self, rows, batch_size, skip_existing, **options):
+        table = connection.ops.quote_name(Ingredient._meta.db_table)
+        if skip_existing:
+            on_conflict = 'NOTHING'
+        else:
+            on_conflict = (
+                f'UPDATE SET measurement_unit = EXCLUDED.measurement_unit '
+                f'WHERE {table}.measurement_unit '
+                f'IS DISTINCT FROM EXCLUDED.measurement_unit'
+            )
+
+        total = 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE ingredient_load ('
+                f'position serial, name varchar({NAME_LENGTH}), '
+                f'measurement_unit varchar({UNIT_LENGTH})) ON COMMIT DROP')
+            for chunk in chunked(rows, batch_size):
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(chunk)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    'COPY ingredient_load (name, measurement_unit) '
+                    'FROM STDIN WITH (FORMAT csv)', buffer)
+                total += len(chunk)
+            cursor.execute(
+                f'INSERT INTO {table} (name, measurement_unit) '
+                f'SELECT DISTINCT ON (name) name, measurement_unit '
+                f'FROM ingredient_load ORDER BY name, position DESC '
+                f'ON CONFLICT (name) DO {on_conflict}')
+            written = cursor.rowcount
+        return total, written
+
+    def load_orm(self, rows, batch_size, skip_existing, **options):
+        total = written = 0
+        count_before = Ingredient.objects.count()
+        for chunk in chunked(rows, batch_size):
+            total += len(chunk)
+            units = dict(chunk)
+            existing = Ingredient.objects.in_bulk(
+                list(units), field_name='name')
+            if not skip_existing:
+                changed = []
+                for name, ingredient in existing.items():
+                    if ingredient.measurement_unit != units[name]:
+                        ingredient.measurement_unit = units[name]
+                        changed.append(ingredient)
+                Ingredient.objects.bulk_update(
+                    changed, ['measurement_unit'], batch_size=batch_size)
+                written += len(changed)
+            units = {name: unit for name, unit in units.items()
+                     if name not in existing}
+            Ingredient.objects.bulk_create(
+                [Ingredient(name=name, measurement_unit=unit)
+                 for name, unit in units.items()],
+                batch_size=batch_size, ignore_conflicts=True)
+        written += Ingredient.objects.count() - count_before
+        return total, written
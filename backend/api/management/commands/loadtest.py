@@ -0,0 +1,65 @@
+import statistics
+import threading
+import time
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Нагружает запущенный сервер GET-запросами и выводит задержки'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='Адреса для запросов')
+        parser.add_argument('--concurrency', type=int, default=16,
+                            help='Количество одновременных клиентов')
+        parser.add_argument('--duration', type=float, default=30,
+                            help='Длительность теста в секундах')
+        parser.add_argument('--token',
+                            help='Токен для заголовка Authorization')
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options['token']:
+            headers['Authorization'] = f'Token {options["token"]}'
+        deadline = time.monotonic() + options['duration']
+        timings, errors = [], []
+
+        def worker(offset):
+            urls = options['urls']
+            position = offset
+            while time.monotonic() < deadline:
+                url = urls[position % len(urls)]
+                position += 1
+                started = time.perf_counter()
+                try:
+                    with urlopen(Request(url, headers=headers)) as response:
+                        response.read()
+                except (URLError, OSError) as error:
+                    errors.append(error)
+                    continue
+                timings.append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=worker, args=(offset, ))
+                   for offset in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if not timings:
+            self.stderr.write(f'Все запросы завершились ошибкой: {errors[:1]}')
+            return
+        timings.sort()
+
+        def percentile(value):
+            return timings[min(len(timings) - 1,
+                               int(len(timings) * value))] * 1000
+
+        self.stdout.write(
+            f'Запросов: {len(timings)}, ошибок: {len(errors)}, '
+            f'{len(timings) / options["duration"]:.1f} запр./с; '
+            f'p50 {percentile(0.5):.1f} мс, p95 {percentile(0.95):.1f} мс, '
+            f'p99 {percentile(0.99):.1f} мс, '
+            f'среднее {statistics.mean(timings) * 1000:.1f} мс')
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import feed
+from api.models import FeedEntry, Follow
+
+
+class Command(BaseCommand):
+    help = 'Заполняет ленты подписчиков рецептами их авторов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Предварительно удалить все записи лент')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            FeedEntry.objects.all().delete()
+        follows = Follow.objects.filter(
+            author__followers_count__lte=settings.FEED_FANOUT_MAX_FOLLOWERS,
+        ).values_list('user_id', 'author_id').order_by('id')
+        for user_id, author_id in follows.iterator():
+            feed.backfill(user_id, author_id)
+        self.stdout.write(self.style.SUCCESS(
+            f'Записей в лентах: {FeedEntry.objects.count()}'))
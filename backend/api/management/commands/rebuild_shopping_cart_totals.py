@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api import cart_totals
+from api.models import ShoppingCartTotal, ShoppingList
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает итоги списков покупок по ингредиентам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='users',
+            help='Пересчитать только для пользователя с этим id')
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Количество пользователей, пересчитываемых за один запрос')
+
+    def handle(self, *args, **options):
+        users = options['users']
+        if users is None:
+            ShoppingCartTotal.objects.exclude(
+                user__in=ShoppingList.objects.values('user_id')).delete()
+            users = list(ShoppingList.objects.order_by('user_id')
+                         .values_list('user_id', flat=True).distinct())
+        batch_size = options['batch_size']
+        for start in range(0, len(users), batch_size):
+            with transaction.atomic():
+                cart_totals.rebuild(users[start:start + batch_size])
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано пользователей: {len(users)}, строк итогов: '
+            f'{ShoppingCartTotal.objects.count()}'))
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from api import feed
+from api.models import Favorite, Follow, Recipe
+from users.models import CustomUser
+
+
+def count_of(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by().values(field).annotate(total=Count('pk'))
+        .values('total'),
+        output_field=IntegerField(),
+    ), 0)
+
+
+COUNTERS = (
+    (Recipe, 'favorites_count', count_of(Favorite, 'recipe')),
+    (CustomUser, 'recipes_count', count_of(Recipe, 'author')),
+    (CustomUser, 'followers_count', count_of(Follow, 'author')),
+)
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики и исправляет расхождения'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество строк, проверяемых за один запрос')
+
+    def handle(self, *args, **options):
+        for model, field, actual in COUNTERS:
+            fixed = self.reconcile(model, field, actual,
+                                   options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.label}.{field}: исправлено {fixed}'))
+
+    def reconcile(self, model, field, actual, batch_size):
+        fixed, last_id = 0, 0
+        while True:
+            batch = list(
+                model.objects.filter(pk__gt=last_id).order_by('pk')
+                .annotate(actual=actual)
+                .values_list('pk', field, 'actual')[:batch_size]
+            )
+            if not batch:
+                return fixed
+            last_id = batch[-1][0]
+            drifted = [model(pk=pk, **{field: value})
+                       for pk, stored, value in batch if stored != value]
+            model.objects.bulk_update(drifted, [field])
+            if field == 'followers_count':
+                self.backfill_feeds(batch)
+            fixed += len(drifted)
+
+    def backfill_feeds(self, batch):
+        for pk, stored, value in batch:
+            if feed.is_fanout_tier(value) and not feed.is_fanout_tier(stored):
+                feed.backfill_followers(pk)
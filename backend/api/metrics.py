@@ -0,0 +1,248 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from rest_framework.serializers import BaseSerializer
+
+from foodgram.db.postgresql_pool.base import get_stats as get_pool_stats
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HISTOGRAMS = {
+    'http_request_duration_seconds': (
+        'Время обработки запроса', DURATION_BUCKETS),
+    'db_queries': ('Число SQL-запросов на запрос', QUERY_BUCKETS),
+    'db_query_duration_seconds': (
+        'Суммарное время SQL-запросов на запрос', DURATION_BUCKETS),
+    'serializer_duration_seconds': (
+        'Время to_representation сериализаторов на запрос',
+        DURATION_BUCKETS),
+    'http_response_size_bytes': ('Размер тела ответа', SIZE_BUCKETS),
+}
+
+current = ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.histograms = {name: {} for name in HISTOGRAMS}
+
+    def observe(self, route, method, values, status=None):
+        labels = (route, method)
+        with self.lock:
+            if status is not None:
+                self.requests[(route, method, status)] += 1
+            for name, value in values.items():
+                histograms = self.histograms[name]
+                if labels not in histograms:
+                    histograms[labels] = Histogram(HISTOGRAMS[name][1])
+                histograms[labels].observe(value)
+
+    def export(self):
+        prefix = settings.METRICS_PREFIX
+        worker = f'worker="{os.getpid()}"'
+        with self.lock:
+            requests = sorted(self.requests.items())
+            histograms = {
+                name: sorted((labels, list(histogram.counts), histogram.sum)
+                             for labels, histogram in values.items())
+                for name, values in self.histograms.items()
+            }
+
+        lines = [f'# HELP {prefix}http_requests_total Число запросов',
+                 f'# TYPE {prefix}http_requests_total counter']
+        for (route, method, status), value in requests:
+            lines.append(
+                f'{prefix}http_requests_total{{{worker},route="{route}",'
+                f'method="{method}",status="{status}"}} {value}')
+
+        for name, (description, buckets) in HISTOGRAMS.items():
+            metric = prefix + name
+            lines += [f'# HELP {metric} {description}',
+                      f'# TYPE {metric} histogram']
+            for (route, method), counts, total in histograms[name]:
+                labels = f'{worker},route="{route}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip(buckets + ('+Inf', ), counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} '
+                                 f'{cumulative}')
+                lines += [f'{metric}_sum{{{labels}}} {total}',
+                          f'{metric}_count{{{labels}}} {cumulative}']
+
+        pools = get_pool_stats()
+        for key in sorted({key for stats in pools.values() for key in stats}):
+            metric = f'{prefix}db_pool_{key}'
+            lines.append(f'# TYPE {metric} gauge')
+            for alias, stats in sorted(pools.items()):
+                lines.append(
+                    f'{metric}{{{worker},alias="{alias}"}} {stats[key]}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.queries = []
+        self.serializer_time = 0
+        self.serializing = False
+
+    @property
+    def query_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    def top_queries(self, limit):
+        statements = defaultdict(lambda: [0, 0])
+        for sql, duration in self.queries:
+            statements[sql][0] += 1
+            statements[sql][1] += duration
+        return sorted(statements.items(), key=lambda item: item[1][1],
+                      reverse=True)[:limit]
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries.append((sql, time.perf_counter() - started))
+
+
+def add_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def measure_serializer(data):
+    @functools.wraps(data)
+    def measured(serializer):
+        metrics = current.get()
+        if metrics is None or metrics.serializing:
+            return data(serializer)
+        metrics.serializing = True
+        started = time.perf_counter()
+        try:
+            return data(serializer)
+        finally:
+            metrics.serializer_time += time.perf_counter() - started
+            metrics.serializing = False
+    return measured
+
+
+def install():
+    connection_created.connect(add_query_recorder)
+    BaseSerializer.data = property(
+        measure_serializer(BaseSerializer.data.fget))
+
+
+def get_route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.url_name or match.route
+
+
+def count_streaming(content, route, method):
+    size = 0
+    for chunk in content:
+        size += len(chunk)
+        yield chunk
+    registry.observe(route, method, {'http_response_size_bytes': size})
+
+
+def log_slow_request(request, route, duration, metrics):
+    limit = settings.METRICS_SLOW_REQUEST_QUERIES
+    statements = '\n'.join(
+        f'  {total * 1000:.1f} мс, {count} раз: {sql}'
+        for sql, (count, total) in metrics.top_queries(limit))
+    logger.warning(
+        'Медленный запрос %s %s (%s): %.0f мс, SQL: %d запросов за %.0f мс, '
+        'сериализация %.0f мс\n%s',
+        request.method, request.get_full_path(), route, duration * 1000,
+        len(metrics.queries), metrics.query_time * 1000,
+        metrics.serializer_time * 1000, statements)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.record(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current.set(metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.record(request, response, metrics, started)
+
+    def record(self, request, response, metrics, started):
+        duration = time.perf_counter() - started
+        route, method = get_route(request), request.method
+        values = {
+            'http_request_duration_seconds': duration,
+            'db_queries': len(metrics.queries),
+            'db_query_duration_seconds': metrics.query_time,
+            'serializer_duration_seconds': metrics.serializer_time,
+        }
+        if response.streaming:
+            response.streaming_content = count_streaming(
+                response.streaming_content, route, method)
+        else:
+            values['http_response_size_bytes'] = len(response.content)
+        registry.observe(route, method, values, response.status_code)
+
+        if duration >= settings.METRICS_SLOW_REQUEST_THRESHOLD:
+            log_slow_request(request, route, duration, metrics)
+        return response
@@ -1,9 +1,15 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import (BooleanField, Exists, F, OuterRef, Prefetch,
+                              Value, Window)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
 from django.utils.html import format_html
 
 from users.models import CustomUser
 
+from .storage import ContentAddressedStorage
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -76,6 +82,60 @@ class Ingredient(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+
+    def with_user_flags(self, user):
+        if user.is_anonymous:
+            return self.annotate(
+                is_favorited=Value(False, output_field=BooleanField()),
+                is_in_shopping_cart=Value(False, output_field=BooleanField()),
+            )
+        return self.annotate(
+            is_favorited=Exists(Favorite.objects.filter(
+                user=user, recipe=OuterRef('pk'))),
+            is_in_shopping_cart=Exists(ShoppingList.objects.filter(
+                user=user, recipe=OuterRef('pk'))),
+        )
+
+    def with_related(self, user):
+        if user.is_anonymous:
+            is_subscribed = Value(False, output_field=BooleanField())
+        else:
+            is_subscribed = Exists(Follow.objects.filter(
+                user=user, author=OuterRef('pk')))
+        authors = CustomUser.objects.annotate(
+            is_subscribed=is_subscribed,
+        ).prefetch_related(
+            Prefetch('purchases', queryset=ShoppingList.objects.only(
+                'id', 'user_id')),
+        )
+        return self.prefetch_related(
+            Prefetch('author', queryset=authors),
+            'tags',
+            Prefetch('ingredientinrecipe_set',
+                     queryset=IngredientInRecipe.objects.select_related(
+                         'ingredient')),
+        )
+
+    def for_user(self, user):
+        return self.with_user_flags(user).with_related(user)
+
+    def latest_per_author(self, limit):
+        ranked = self.order_by().annotate(
+            author_position=Window(
+                expression=RowNumber(),
+                partition_by=[F('author')],
+                order_by=[F('pub_date').desc(), F('id').desc()],
+            ),
+        ).values('id', 'author_position')
+        sql, params = ranked.query.sql_with_params()
+        return self.model.objects.filter(id__in=RawSQL(
+            f'SELECT ranked.id FROM ({sql}) ranked '
+            f'WHERE ranked.author_position <= %s',
+            (*params, limit),
+        ))
+
+
 class Recipe(models.Model):
     tags = models.ManyToManyField(Tag,
                                   related_name='recipes',
@@ -97,23 +157,38 @@ class Recipe(models.Model):
                             help_text='Напишите название',
                             )
     image = models.ImageField(upload_to='recipes',
+                              storage=ContentAddressedStorage(),
                               verbose_name='Фото блюда',
                               help_text='Загрузите фото',
                               )
+    has_image_variants = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Уменьшенные копии фото готовы',
+    )
     text = models.TextField(verbose_name='Описание',
                             help_text='Напишите описание',
                             )
     pub_date = models.DateTimeField(auto_now_add=True,
                                     verbose_name='Дата публикации',
                                     )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В избранном у пользователей',
+    )
     cooking_time = models.PositiveSmallIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(1440)],
         verbose_name='Время приготовления в минутах',
         help_text='Укажите время приготовления в минутах',
     )
 
+    objects = RecipeQuerySet.as_manager()
+
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [models.Index(fields=['-pub_date', '-id'],
+                                name='recipe_pub_date_id_idx')]
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
 
@@ -182,6 +257,52 @@ class ShoppingList(models.Model):
     class Meta:
         verbose_name = 'Покупка'
         verbose_name_plural = 'Список покупок'
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'recipe'],
+            name='unique_shopping_list_recipes')]
 
     def __str__(self):
         return f'Пользователь: {self.user}, покупает:{self.recipe}'
+
+
+class ShoppingCartTotal(models.Model):
+    user = models.ForeignKey(CustomUser,
+                             on_delete=models.CASCADE,
+                             related_name='shopping_cart_totals',
+                             verbose_name='Пользователь',
+                             )
+    ingredient = models.ForeignKey(Ingredient,
+                                   on_delete=models.CASCADE,
+                                   related_name='shopping_cart_totals',
+                                   verbose_name='Ингредиент',
+                                   )
+    amount = models.IntegerField(verbose_name='Количество')
+
+    class Meta:
+        verbose_name = 'Итог списка покупок'
+        verbose_name_plural = 'Итоги списков покупок'
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'ingredient'],
+            name='unique_shopping_cart_total')]
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(CustomUser,
+                             on_delete=models.CASCADE,
+                             related_name='feed_entries',
+                             verbose_name='Подписчик',
+                             )
+    recipe = models.ForeignKey(Recipe,
+                               on_delete=models.CASCADE,
+                               related_name='feed_entries',
+                               verbose_name='Рецепт',
+                               )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'recipe'], name='unique_feed_entry')]
+        indexes = [models.Index(fields=['user', '-pub_date', '-recipe'],
+                                name='feed_user_pub_date_idx')]
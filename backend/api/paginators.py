@@ -1,5 +1,106 @@
+import base64
+import binascii
+from collections import OrderedDict
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class PageNumberPaginatorModified(PageNumberPagination):
     page_size_query_param = 'limit'
+
+
+class RecipePagination(PageNumberPaginatorModified):
+    cursor_query_param = 'cursor'
+    count_query_param = 'with_count'
+    search_query_param = 'search'
+    invalid_cursor_message = 'Неверный курсор'
+    cursor_with_search_message = (
+        'Курсорная пагинация не поддерживает поиск: результаты поиска '
+        'упорядочены по релевантности, используйте page')
+    ordering = ('pub_date', 'id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        if request.query_params.get(self.search_query_param, '').strip():
+            raise ValidationError(
+                {self.cursor_query_param: self.cursor_with_search_message})
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(
+            request.query_params[self.cursor_query_param])
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.count = queryset.count()
+
+        first, second = self.ordering
+        if position is None:
+            queryset = queryset.order_by(f'-{first}', f'-{second}')
+        elif reverse:
+            pub_date, id_ = position
+            queryset = queryset.filter(
+                Q(**{f'{first}__gt': pub_date})
+                | Q(**{first: pub_date, f'{second}__gt': id_})
+            ).order_by(first, second)
+        else:
+            pub_date, id_ = position
+            queryset = queryset.filter(
+                Q(**{f'{first}__lt': pub_date})
+                | Q(**{first: pub_date, f'{second}__lt': id_})
+            ).order_by(f'-{first}', f'-{second}')
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.results = results
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+        response['next'] = self.get_cursor_link(
+            self.has_next, self.results[-1:], reverse=False)
+        response['previous'] = self.get_cursor_link(
+            self.has_previous, self.results[:1], reverse=True)
+        response['results'] = data
+        return Response(response)
+
+    def get_cursor_link(self, exists, boundary, reverse):
+        if not exists:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        if not boundary:
+            return replace_query_param(url, self.cursor_query_param, '')
+        return replace_query_param(url, self.cursor_query_param,
+                                   self.encode_cursor(boundary[0], reverse))
+
+    def encode_cursor(self, recipe, reverse):
+        raw = f'{recipe.pub_date.isoformat()}|{recipe.id}|{int(reverse)}'
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None, False
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+            pub_date, id_, reverse = raw.split('|')
+            return (datetime.fromisoformat(pub_date), int(id_)), reverse == '1'
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
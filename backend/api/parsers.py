@@ -0,0 +1,39 @@
+import io
+
+from django.conf import settings
+from rest_framework import parsers, status
+from rest_framework.exceptions import APIException, ParseError
+
+from .renderers import FastJSONRenderer, orjson
+
+
+class RequestTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Тело запроса слишком большое.'
+    default_code = 'request_too_large'
+
+
+def read_limited(stream):
+    limit = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+    if limit is None:
+        return stream.read()
+    data = stream.read(limit + 1)
+    if len(data) > limit:
+        raise RequestTooLarge()
+    return data
+
+
+class FastJSONParser(parsers.JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        data = read_limited(stream)
+        if (orjson is None or not self.strict
+                or encoding.lower().replace('-', '') != 'utf8'):
+            return super().parse(io.BytesIO(data), media_type, parser_context)
+        try:
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
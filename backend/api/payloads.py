@@ -0,0 +1,89 @@
+import gzip
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .cache import get_stamp
+from .renderers import FastJSONRenderer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODINGS = ('br', 'gzip')
+
+
+def compress(body):
+    variants = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(body, quality=11)
+    return {encoding: content for encoding, content in variants.items()
+            if len(content) < len(body)}
+
+
+def accepted_encodings(request):
+    accepted = {}
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            accepted[coding.lower()] = quality
+    return accepted
+
+
+def choose_encoding(request, variants):
+    accepted = accepted_encodings(request)
+    for encoding in ENCODINGS:
+        if encoding in variants and accepted.get(
+                encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+class PrecompressedPayload:
+
+    def __init__(self, name, get_data):
+        self.name = name
+        self.get_data = get_data
+        self._lock = threading.Lock()
+        self._version = None
+        self._expires = 0
+        self._payload = None
+
+    def _is_current(self, version):
+        return (version == self._version
+                and time.monotonic() < self._expires)
+
+    def _ensure_current(self):
+        version, _ = get_stamp(self.name)
+        if self._is_current(version):
+            return
+        with self._lock:
+            if not self._is_current(version):
+                body = FastJSONRenderer().render(self.get_data())
+                self._payload = (body, compress(body))
+                self._version = version
+                self._expires = (time.monotonic()
+                                 + settings.CATALOG_PAYLOAD_TIMEOUT)
+
+    def response(self, request):
+        self._ensure_current()
+        body, variants = self._payload
+        encoding = choose_encoding(request, variants)
+        response = HttpResponse(variants.get(encoding, body),
+                                content_type=FastJSONRenderer.media_type)
+        if encoding is not None:
+            response['Content-Encoding'] = encoding
+        patch_vary_headers(response, ('Accept-Encoding', ))
+        return response
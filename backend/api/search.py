@@ -0,0 +1,115 @@
+import re
+from functools import lru_cache
+
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector, TrigramSimilarity)
+from django.db import connection, connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
+
+from .models import Recipe
+
+SEARCH_CONFIG = 'russian'
+FTS_TABLE = 'api_recipe_fts'
+
+POSTGRES_SETUP = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    "CREATE INDEX IF NOT EXISTS api_recipe_search_idx ON api_recipe "
+    "USING gin ((setweight(to_tsvector('russian'::regconfig, "
+    "COALESCE(name, '')), 'A') || setweight(to_tsvector("
+    "'russian'::regconfig, COALESCE(text, '')), 'B')))",
+    'CREATE INDEX IF NOT EXISTS api_recipe_name_trgm_idx ON api_recipe '
+    'USING gin (name gin_trgm_ops)',
+)
+
+SQLITE_SETUP = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"name, text, content='api_recipe', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 0')",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON api_recipe '
+    f'BEGIN INSERT INTO {FTS_TABLE}(rowid, name, text) '
+    f'VALUES (new.id, new.name, new.text); END',
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON api_recipe '
+    f"BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, text) "
+    f"VALUES ('delete', old.id, old.name, old.text); END",
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF name, text ON api_recipe '
+    f"BEGIN INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, text) "
+    f"VALUES ('delete', old.id, old.name, old.text); "
+    f'INSERT INTO {FTS_TABLE}(rowid, name, text) '
+    f'VALUES (new.id, new.name, new.text); END',
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+
+
+@lru_cache(maxsize=None)
+def has_fts5(using='default'):
+    with connections[using].cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return ('ENABLE_FTS5',) in cursor.fetchall()
+
+
+def install(using='default'):
+    vendor = connections[using].vendor
+    if vendor == 'postgresql':
+        statements = POSTGRES_SETUP
+    elif vendor == 'sqlite' and has_fts5(using):
+        statements = SQLITE_SETUP
+    else:
+        return
+    with connections[using].cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def search_postgresql(queryset, query):
+    vector = (SearchVector('name', config=SEARCH_CONFIG, weight='A')
+              + SearchVector('text', config=SEARCH_CONFIG, weight='B'))
+    search_query = SearchQuery(query, config=SEARCH_CONFIG,
+                               search_type='websearch')
+    return queryset.annotate(
+        search_vector=vector,
+        search_rank=Greatest(
+            SearchRank(vector, search_query),
+            TrigramSimilarity('name', query),
+        ),
+    ).filter(
+        Q(search_vector=search_query) | Q(name__trigram_similar=query)
+    )
+
+
+def search_sqlite(queryset, query):
+    words = re.findall(r'\w+', query)
+    if not words:
+        return search_fallback(queryset.none(), query)
+    match = ' '.join(f'"{word}"*' for word in words)
+    return queryset.filter(
+        id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (match, ),
+        ),
+    ).annotate(
+        search_rank=RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, 2.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = api_recipe.id',
+            (match, ),
+            output_field=FloatField(),
+        ),
+    )
+
+
+def search_fallback(queryset, query):
+    return queryset.filter(
+        Q(name__icontains=query) | Q(text__icontains=query)
+    ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def search_recipes(queryset, query):
+    if connection.vendor == 'postgresql':
+        queryset = search_postgresql(queryset, query)
+    elif connection.vendor == 'sqlite' and has_fts5():
+        queryset = search_sqlite(queryset, query)
+    else:
+        queryset = search_fallback(queryset, query)
+    return queryset.order_by(F('search_rank').desc(), *Recipe._meta.ordering)
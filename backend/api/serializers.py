@@ -1,9 +1,17 @@
+from operator import attrgetter
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
 from djoser.serializers import UserSerializer as BaseUserSerializer
 from rest_framework import serializers
 from drf_extra_fields.fields import Base64ImageField
 
+from . import cart_totals
+from .images import get_srcset
 from .models import (Favorite, Follow, Ingredient,
                      IngredientInRecipe, Recipe, ShoppingList, Tag)
+from .uploads import read_image_token
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -14,12 +22,6 @@ class TagSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'color', 'slug')
         read_only_fields = ('name', 'color', 'slug')
 
-    def validate_id(self, id_):
-        if not Tag.objects.filter(id=id_).exists():
-            msg = f'Tag with id `{id_}` does not exist.'
-            raise serializers.ValidationError(msg)
-        return id_
-
 
 class FollowSerializer(serializers.ModelSerializer):
 
@@ -42,12 +44,6 @@ class IngredientSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['name', 'measurement_unit']
 
-    def validate_id(self, id_):
-        if not Ingredient.objects.filter(id=id_).exists():
-            msg = f'Ingredient with id `{id_}` does not exist.'
-            raise serializers.ValidationError(msg)
-        return id_
-
     def validate_amount(self, amount):
         if amount <= 0:
             raise serializers.ValidationError(
@@ -55,14 +51,54 @@ class IngredientSerializer(serializers.ModelSerializer):
         return amount
 
 
+class RecipeImageField(Base64ImageField):
+    default_error_messages = {
+        'too_large': 'Размер фото не должен превышать {max_size} байт.',
+        'invalid_token': 'Ссылка на загруженное фото недействительна.',
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) and ':' in data and ';base64,' not in data:
+            try:
+                name = read_image_token(data)
+            except signing.BadSignature:
+                self.fail('invalid_token')
+            if not Recipe._meta.get_field('image').storage.exists(name):
+                self.fail('invalid_token')
+            return name
+
+        max_size = settings.RECIPE_IMAGE_MAX_SIZE
+        if isinstance(data, str) and len(data) > (max_size + 2) // 3 * 4 + 64:
+            self.fail('too_large', max_size=max_size)
+        return super().to_internal_value(data)
+
+
+class RecipeImageUploadSerializer(serializers.Serializer):
+    image = serializers.ImageField()
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.USER_RECIPES_BATCH_LIMIT,
+    )
+
+    def validate_recipes(self, recipes):
+        return list(dict.fromkeys(recipes))
+
+
 class RecipeSerializer(serializers.ModelSerializer):
-    ingredients = IngredientSerializer(many=True)
-    image = Base64ImageField(
+    tags = serializers.ListField(child=serializers.IntegerField(),
+                                 write_only=True, required=False)
+    ingredients = IngredientSerializer(many=True, write_only=True)
+    image = RecipeImageField(
         max_length=None,
         required=True,
         allow_empty_file=False,
         use_url=True,
     )
+    image_srcset = serializers.SerializerMethodField()
     author = serializers.SerializerMethodField()
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
@@ -76,16 +112,24 @@ class RecipeSerializer(serializers.ModelSerializer):
             'ingredients',
             'name',
             'image',
+            'image_srcset',
             'text',
             'cooking_time',
             'is_favorited',
             'is_in_shopping_cart',
         ]
 
+    def get_image_srcset(self, recipe):
+        return get_srcset(recipe, self.context.get('request'))
+
     def get_author(self, recipe):
-        return UserSerializer(recipe.author, omit=['recipes']).data
+        return UserSerializer(recipe.author, omit=['recipes'],
+                              context=self.context).data
 
     def get_is_favorited(self, recipe):
+        if hasattr(recipe, 'is_favorited'):
+            return recipe.is_favorited
+
         request = self.context.get('request')
 
         if request is None or request.user.is_anonymous:
@@ -95,6 +139,9 @@ class RecipeSerializer(serializers.ModelSerializer):
         return Favorite.objects.filter(recipe=recipe, user=user).exists()
 
     def get_is_in_shopping_cart(self, recipe):
+        if hasattr(recipe, 'is_in_shopping_cart'):
+            return recipe.is_in_shopping_cart
+
         request = self.context.get('request')
 
         if request is None or request.user.is_anonymous:
@@ -103,65 +150,167 @@ class RecipeSerializer(serializers.ModelSerializer):
         user = request.user
         return ShoppingList.objects.filter(recipe=recipe, user=user).exists()
 
+    def validate_tags(self, tags):
+        existing = Tag.objects.in_bulk(tags)
+        for id_ in tags:
+            if id_ not in existing:
+                msg = f'Tag with id `{id_}` does not exist.'
+                raise serializers.ValidationError(msg)
+        return list(dict.fromkeys(tags))
+
+    def validate_ingredients(self, ingredients):
+        amounts = {}
+        for ingredient in ingredients:
+            id_ = ingredient['id']
+            amounts[id_] = amounts.get(id_, 0) + ingredient['amount']
+
+        existing = Ingredient.objects.in_bulk(list(amounts))
+        for id_ in amounts:
+            if id_ not in existing:
+                msg = f'Ingredient with id `{id_}` does not exist.'
+                raise serializers.ValidationError(msg)
+        return amounts
+
+    @transaction.atomic
     def create(self, validated_data):
-        tags_data = validated_data.pop('tags')
-
+        tags_data = validated_data.pop('tags', [])
         ingredients_data = validated_data.pop('ingredients')
         author = self.context.get('request').user
 
         recipe = Recipe.objects.create(author=author, **validated_data)
-        recipe.save()
         recipe.tags.set(tags_data)
 
         IngredientInRecipe.objects.bulk_create([
-            IngredientInRecipe(
-                recipe=recipe,
-                ingredient=Ingredient.objects.get(id=ingredient['id']),
-                amount=ingredient['amount']) for ingredient in
-            ingredients_data
+            IngredientInRecipe(recipe=recipe, ingredient_id=id_, amount=amount)
+            for id_, amount in ingredients_data.items()
         ])
+        author.refresh_from_db(fields=['recipes_count'])
 
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        ingredients_data = validated_data.pop('ingredients')
-        tags_data = validated_data.pop('tags')
-
-        IngredientInRecipe.objects.filter(recipe=instance).delete()
-
-        IngredientInRecipe.objects.bulk_create([
-            IngredientInRecipe(
-                recipe=instance,
-                ingredient=Ingredient.objects.get(id=ingredient['id']),
-                amount=ingredient['amount']) for ingredient in
-            ingredients_data
-        ])
+        ingredients_data = validated_data.pop('ingredients', None)
+        tags_data = validated_data.pop('tags', None)
 
-        instance.name = validated_data.pop('name')
-        instance.text = validated_data.pop('text')
-
-        if validated_data.get('image') is not None:
-            instance.image = validated_data.pop('image')
-
-        instance.cooking_time = validated_data.pop('cooking_time')
+        if validated_data.get('image') is None:
+            validated_data.pop('image', None)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
         instance.save()
-        instance.tags.set(tags_data)
+
+        if tags_data is not None:
+            instance.tags.set(tags_data)
+        if ingredients_data is not None:
+            self.update_ingredients(instance, ingredients_data)
 
         return instance
 
+    def update_ingredients(self, recipe, amounts):
+        amounts = dict(amounts)
+        deltas = dict(amounts)
+        stale, changed = [], []
+        rows = IngredientInRecipe.objects.filter(recipe=recipe).only(
+            'id', 'ingredient_id', 'amount')
+        for row in rows:
+            deltas[row.ingredient_id] = (
+                deltas.get(row.ingredient_id, 0) - row.amount)
+            amount = amounts.pop(row.ingredient_id, None)
+            if amount is None:
+                stale.append(row.id)
+            elif amount != row.amount:
+                row.amount = amount
+                changed.append(row)
+
+        if stale:
+            IngredientInRecipe.objects.filter(id__in=stale).delete()
+        if changed:
+            IngredientInRecipe.objects.bulk_update(changed, ['amount'])
+        if amounts:
+            IngredientInRecipe.objects.bulk_create([
+                IngredientInRecipe(recipe=recipe, ingredient_id=id_,
+                                   amount=amount)
+                for id_, amount in amounts.items()
+            ])
+        cart_totals.change_recipe(recipe.id, deltas)
+
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        tags_data = TagSerializer(instance.tags.all(), many=True).data
+        data['tags'] = TagSerializer(instance.tags.all(), many=True).data
 
-        ings = instance.ingredientinrecipe_set.prefetch_related('ingredient').all() # noqa
-        ingredients_data = [
+        ings = instance.ingredientinrecipe_set.all()
+        if 'ingredientinrecipe_set' not in getattr(
+                instance, '_prefetched_objects_cache', {}):
+            ings = ings.select_related('ingredient')
+        data['ingredients'] = [
             {
                 **IngredientSerializer(ingredient_in_recipe.ingredient).data,
                 'amount': ingredient_in_recipe.amount
             } for ingredient_in_recipe in ings
         ]
 
-        return {**data, 'tags': tags_data, 'ingredients': ingredients_data}
+        return {field: data[field] for field in self.Meta.fields}
+
+
+class RecipeMinifiedSerializer(serializers.ModelSerializer):
+    image_srcset = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Recipe
+        fields = ('id', 'name', 'image', 'image_srcset', 'cooking_time')
+        read_only_fields = fields
+
+    def get_image_srcset(self, recipe):
+        return get_srcset(recipe, self.context.get('request'))
+
+
+def projection(fields, *paths):
+    getter = attrgetter(*(paths or fields))
+    return lambda obj: dict(zip(fields, getter(obj)))
+
+
+project_tag = projection(('id', 'name', 'color', 'slug'))
+project_author = projection(
+    ('email', 'id', 'username', 'first_name', 'last_name'))
+project_ingredient = projection(
+    ('id', 'name', 'measurement_unit', 'amount'),
+    'ingredient.id', 'ingredient.name', 'ingredient.measurement_unit',
+    'amount')
+
+
+class RecipeCardSerializer(serializers.BaseSerializer):
+
+    def to_representation(self, recipe):
+        request = self.context.get('request')
+        image = None
+        if recipe.image:
+            image = recipe.image.url
+            if request is not None:
+                image = request.build_absolute_uri(image)
+        author = recipe.author
+        return {
+            'id': recipe.id,
+            'tags': [project_tag(tag) for tag in recipe.tags.all()],
+            'author': {
+                **project_author(author),
+                'purchases': [purchase.pk
+                              for purchase in author.purchases.all()],
+                'is_subscribed': author.is_subscribed,
+                'recipes_count': author.recipes_count,
+            },
+            'ingredients': [
+                project_ingredient(ingredient_in_recipe)
+                for ingredient_in_recipe
+                in recipe.ingredientinrecipe_set.all()
+            ],
+            'name': recipe.name,
+            'image': image,
+            'image_srcset': get_srcset(recipe, request),
+            'text': recipe.text,
+            'cooking_time': recipe.cooking_time,
+            'is_favorited': recipe.is_favorited,
+            'is_in_shopping_cart': recipe.is_in_shopping_cart,
+        }
 
 
 class UserSerializer(BaseUserSerializer):
@@ -189,6 +338,9 @@ class UserSerializer(BaseUserSerializer):
             del self.fields[field]
 
     def get_is_subscribed(self, user):
+        if hasattr(user, 'is_subscribed'):
+            return user.is_subscribed
+
         request = self.context.get('request')
 
         if request is None or request.user.is_anonymous:
@@ -197,7 +349,11 @@ class UserSerializer(BaseUserSerializer):
         return Follow.objects.filter(user=request.user, author=user).exists()
 
     def get_recipes_count(self, user):
-        return user.recipes.count()
+        return user.recipes_count
+
+
+class SubscriptionSerializer(UserSerializer):
+    recipes = RecipeMinifiedSerializer(many=True, read_only=True)
 
 
 class IngredientInRecipeSerializer(serializers.ModelSerializer):
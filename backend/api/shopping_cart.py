@@ -0,0 +1,86 @@
+import csv
+import io
+
+from django.conf import settings
+from django.db.models import F
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from .models import ShoppingCartTotal
+
+FOOTER = 'FoodGram, 2021'
+PDF_FONT_NAME = 'ShoppingCartFont'
+PDF_CHUNK_SIZE = 64 * 1024
+
+
+def get_buying_list(user):
+    return (
+        ShoppingCartTotal.objects
+        .filter(user=user)
+        .values('amount', name=F('ingredient__name'),
+                measurement_unit=F('ingredient__measurement_unit'))
+        .order_by('name', 'measurement_unit')
+    )
+
+
+def render_txt(buying_list):
+    for item in buying_list.iterator():
+        yield (f'{item["name"]} - {item["amount"]} '
+               f'{item["measurement_unit"]} \n')
+    yield '\n'
+    yield FOOTER
+
+
+class Echo:
+
+    def write(self, value):
+        return value
+
+
+def render_csv(buying_list):
+    writer = csv.writer(Echo())
+    yield writer.writerow(['Ингредиент', 'Количество', 'Единица измерения'])
+    for item in buying_list.iterator():
+        yield writer.writerow(
+            [item['name'], item['amount'], item['measurement_unit']])
+
+
+def register_pdf_font():
+    if PDF_FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(
+            TTFont(PDF_FONT_NAME, settings.SHOPPING_CART_PDF_FONT))
+
+
+def render_pdf(buying_list):
+    register_pdf_font()
+    buffer = io.BytesIO()
+    page = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    top, bottom, left, line_height = height - 60, 60, 50, 18
+
+    page.setFont(PDF_FONT_NAME, 16)
+    page.drawString(left, top, 'Список покупок')
+    page.setFont(PDF_FONT_NAME, 12)
+    y = top - 2 * line_height
+    for item in buying_list.iterator():
+        if y < bottom:
+            page.showPage()
+            page.setFont(PDF_FONT_NAME, 12)
+            y = top
+        page.drawString(left, y, f'{item["name"]} - {item["amount"]} '
+                                 f'{item["measurement_unit"]}')
+        y -= line_height
+    page.drawString(left, bottom - line_height, FOOTER)
+    page.save()
+
+    buffer.seek(0)
+    yield from iter(lambda: buffer.read(PDF_CHUNK_SIZE), b'')
+
+
+FORMATS = {
+    'txt': (render_txt, 'text/plain; charset=utf-8'),
+    'csv': (render_csv, 'text/csv; charset=utf-8'),
+    'pdf': (render_pdf, 'application/pdf'),
+}
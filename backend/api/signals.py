@@ -0,0 +1,183 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_migrate, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import (authentication, cache, cart_totals, feed, images,
+               ingredient_index, search)
+from .models import (Favorite, Follow, Ingredient, IngredientInRecipe, Recipe,
+                     ShoppingList, Tag)
+from users.models import CustomUser
+
+
+@receiver([post_save, post_delete], sender=Ingredient)
+def invalidate_ingredient_index(**kwargs):
+    transaction.on_commit(ingredient_index.invalidate)
+
+
+@receiver([post_save, post_delete], sender=Recipe)
+@receiver([post_save, post_delete], sender=IngredientInRecipe)
+@receiver([post_save, post_delete], sender=Ingredient)
+@receiver([post_save, post_delete], sender=Tag)
+@receiver([post_save, post_delete], sender=ShoppingList)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def bump_recipes_data_version(**kwargs):
+    transaction.on_commit(cache.bump_data_version)
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def touch_tags(**kwargs):
+    transaction.on_commit(lambda: cache.touch('tags'))
+
+
+@receiver([post_save, post_delete], sender=Favorite)
+@receiver([post_save, post_delete], sender=ShoppingList)
+@receiver([post_save, post_delete], sender=Follow)
+def touch_user_state(instance, **kwargs):
+    name = f'user-{instance.user_id}'
+    transaction.on_commit(lambda: cache.touch(name))
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def bump_recipes_data_version_for_author(update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    transaction.on_commit(cache.bump_data_version)
+
+
+@receiver(post_delete, sender=Token)
+def forget_token(instance, **kwargs):
+    key = instance.key
+    transaction.on_commit(lambda: authentication.invalidate(key))
+
+
+AUTH_FIELDS = ('password', 'is_active', 'is_staff', 'is_superuser')
+
+
+def get_auth_state(user):
+    return tuple(user.__dict__.get(field) for field in AUTH_FIELDS)
+
+
+@receiver(post_init, sender=CustomUser)
+def remember_auth_state(instance, **kwargs):
+    instance._initial_auth_state = get_auth_state(instance)
+
+
+@receiver(post_save, sender=CustomUser)
+def forget_user_tokens(instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    state = get_auth_state(instance)
+    changed = state != instance._initial_auth_state
+    instance._initial_auth_state = state
+    if created or not changed:
+        return
+    keys = list(Token.objects.filter(
+        user_id=instance.id).values_list('key', flat=True))
+    transaction.on_commit(lambda: authentication.invalidate(*keys))
+
+
+@receiver(post_save, sender=Favorite)
+def increment_favorites_count(instance, created, **kwargs):
+    if created:
+        Recipe.objects.filter(id=instance.recipe_id).update(
+            favorites_count=F('favorites_count') + 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def decrement_favorites_count(instance, **kwargs):
+    Recipe.objects.filter(id=instance.recipe_id, favorites_count__gt=0).update(
+        favorites_count=F('favorites_count') - 1)
+
+
+@receiver(post_save, sender=Recipe)
+def increment_recipes_count(instance, created, **kwargs):
+    if created:
+        CustomUser.objects.filter(id=instance.author_id).update(
+            recipes_count=F('recipes_count') + 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def decrement_recipes_count(instance, **kwargs):
+    CustomUser.objects.filter(
+        id=instance.author_id, recipes_count__gt=0,
+    ).update(recipes_count=F('recipes_count') - 1)
+
+
+@receiver(post_save, sender=ShoppingList)
+def add_to_cart_totals(instance, created, **kwargs):
+    if created:
+        cart_totals.add_recipes(instance.user_id, [instance.recipe_id])
+
+
+@receiver(pre_delete, sender=ShoppingList)
+def remove_from_cart_totals(instance, **kwargs):
+    cart_totals.add_recipes(instance.user_id, [instance.recipe_id], sign=-1)
+
+
+@receiver(post_save, sender=Follow)
+def increment_followers_count(instance, created, **kwargs):
+    if created:
+        CustomUser.objects.filter(id=instance.author_id).update(
+            followers_count=F('followers_count') + 1)
+
+
+@receiver(post_delete, sender=Follow)
+def decrement_followers_count(instance, **kwargs):
+    CustomUser.objects.filter(
+        id=instance.author_id, followers_count__gt=0,
+    ).update(followers_count=F('followers_count') - 1)
+
+
+@receiver(post_save, sender=Recipe)
+def fan_out_recipe(instance, created, **kwargs):
+    if created:
+        feed.schedule(feed.fan_out, instance.id)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_feed(instance, created, **kwargs):
+    if created:
+        feed.schedule(feed.backfill, instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def trim_feed(instance, **kwargs):
+    feed.trim(instance.user_id, instance.author_id)
+    if feed.dropped_to_fanout(instance.author_id):
+        feed.schedule(feed.backfill_followers, instance.author_id)
+
+
+@receiver(post_migrate)
+def install_recipe_search(sender, using, **kwargs):
+    if sender is apps.get_app_config('api'):
+        search.install(using)
+
+
+@receiver(post_init, sender=Recipe)
+def remember_recipe_image(instance, **kwargs):
+    instance._initial_image = instance.__dict__.get('image')
+
+
+def recipe_image_changed(instance):
+    if 'image' not in instance.__dict__:
+        return False
+    return bool(instance.image) and (
+        instance.image.name != instance._initial_image)
+
+
+@receiver(pre_save, sender=Recipe)
+def reset_recipe_image_variants(instance, **kwargs):
+    if recipe_image_changed(instance):
+        instance.has_image_variants = False
+
+
+@receiver(post_save, sender=Recipe)
+def schedule_recipe_image_variants(instance, **kwargs):
+    if recipe_image_changed(instance):
+        images.schedule(instance)
+        instance._initial_image = instance.image.name
@@ -0,0 +1,33 @@
+import hashlib
+import os
+import threading
+
+from django.core.files.storage import FileSystemStorage
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def save(self, name, content, max_length=None):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        name = os.path.join(directory, digest.hexdigest() + extension)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length)
+
+    def replace(self, name, content):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as file:
+            for chunk in content.chunks():
+                file.write(chunk)
+        if self.file_permissions_mode is not None:
+            os.chmod(temporary, self.file_permissions_mode)
+        os.replace(temporary, path)
+        return name
@@ -0,0 +1,53 @@
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from api.authentication import local_cache
+from users.models import CustomUser
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+
+    def setUp(self):
+        local_cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email='cook@example.com', username='cook', password='pw12345!',
+            first_name='Иван', last_name='Петров')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def authenticate(self):
+        return self.client.get('/api/users/me/').status_code
+
+    def test_lookup_is_cached(self):
+        self.assertEqual(self.authenticate(), 200)
+        self.assertIsNotNone(local_cache.get(self.token.key))
+
+    def test_login_and_profile_saves_keep_the_entry(self):
+        self.authenticate()
+        self.user.last_login = timezone.now()
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['last_login'])
+
+        self.user.first_name = 'Пётр'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        self.assertIsNotNone(local_cache.get(self.token.key))
+
+    def test_password_change_drops_the_entry(self):
+        self.authenticate()
+        self.user.set_password('new-pw12345!')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+        self.assertIsNone(local_cache.get(self.token.key))
+
+    def test_deactivation_rejects_the_token(self):
+        self.authenticate()
+        user = CustomUser.objects.get(id=self.user.id)
+        user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+
+        self.assertEqual(self.authenticate(), 401)
@@ -0,0 +1,85 @@
+from rest_framework.test import APITestCase
+
+from api import cart_totals
+from api.models import (Ingredient, IngredientInRecipe, Recipe,
+                        ShoppingCartTotal, ShoppingList)
+from users.models import CustomUser
+
+
+def create_user(name):
+    return CustomUser.objects.create_user(
+        email=f'{name}@example.com', username=name, password='pw12345!',
+        first_name=name, last_name=name)
+
+
+class CartTotalsTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('cook')
+        cls.other = create_user('guest')
+        cls.salt, cls.sugar = (
+            Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('соль', 'сахар'))
+        cls.soup = cls.create_recipe('суп', {cls.salt: 5, cls.sugar: 1})
+        cls.cake = cls.create_recipe('торт', {cls.sugar: 200})
+
+    @classmethod
+    def create_recipe(cls, name, amounts):
+        recipe = Recipe.objects.create(
+            author=cls.user, name=name, text=name, cooking_time=10,
+            image='recipes/photo.png')
+        IngredientInRecipe.objects.bulk_create(
+            IngredientInRecipe(recipe=recipe, ingredient=ingredient,
+                               amount=amount)
+            for ingredient, amount in amounts.items())
+        return recipe
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def totals(self, user):
+        return dict(ShoppingCartTotal.objects.filter(user=user).values_list(
+            'ingredient__name', 'amount'))
+
+    def assert_totals(self, user, expected):
+        self.assertEqual(self.totals(user), expected)
+        cart_totals.rebuild([user.id])
+        self.assertEqual(self.totals(user), expected)
+
+    def test_single_and_batch_endpoints(self):
+        self.client.get(f'/api/recipes/{self.soup.id}/shopping_cart/')
+        self.client.post('/api/recipes/shopping_cart/',
+                         {'recipes': [self.soup.id, self.cake.id]},
+                         format='json')
+        self.assert_totals(self.user, {'соль': 5, 'сахар': 201})
+
+        self.client.delete(f'/api/recipes/{self.soup.id}/shopping_cart/')
+        self.assert_totals(self.user, {'сахар': 200})
+
+        self.client.delete('/api/recipes/shopping_cart/',
+                           {'recipes': [self.cake.id]}, format='json')
+        self.assert_totals(self.user, {})
+
+    def test_orm_writes(self):
+        ShoppingList.objects.create(user=self.other, recipe=self.soup)
+        ShoppingList.objects.create(user=self.other, recipe=self.cake)
+        self.assert_totals(self.other, {'соль': 5, 'сахар': 201})
+
+        ShoppingList.objects.filter(user=self.other,
+                                    recipe=self.cake).delete()
+        self.assert_totals(self.other, {'соль': 5, 'сахар': 1})
+
+    def test_recipe_changes(self):
+        ShoppingList.objects.create(user=self.other, recipe=self.soup)
+        ShoppingList.objects.create(user=self.other, recipe=self.cake)
+
+        response = self.client.patch(
+            f'/api/recipes/{self.soup.id}/',
+            {'ingredients': [{'id': self.salt.id, 'amount': 7}]},
+            format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assert_totals(self.other, {'соль': 7, 'сахар': 200})
+
+        self.cake.delete()
+        self.assert_totals(self.other, {'соль': 7})
@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from api.models import Recipe, ShoppingList, Tag
+from users.models import CustomUser
+
+
+@override_settings(CACHE_IS_SHARED=True)
+class ConditionalGetTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='cook@example.com', username='cook', password='pw12345!',
+            first_name='cook', last_name='cook')
+        cls.recipe = Recipe.objects.create(
+            author=cls.user, name='суп', text='суп', cooking_time=10,
+            image='recipes/photo.png')
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url, etag=None):
+        if etag is None:
+            return self.client.get(url)
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_not_modified(self):
+        response = self.get('/api/tags/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        response = self.get('/api/tags/', response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_change_invalidates_etag(self):
+        etag = self.get('/api/tags/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name='Обед', color='#49B64E', slug='lunch')
+
+        response = self.get('/api/tags/', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()), 1)
+
+    def test_recipe_etag_depends_on_the_user(self):
+        url = f'/api/recipes/{self.recipe.id}/'
+        anonymous_etag = self.get(url)['ETag']
+        self.client.force_authenticate(self.user)
+        response = self.get(url, anonymous_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Authorization', response['Vary'])
+
+        etag = response['ETag']
+        self.assertEqual(self.get(url, etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            ShoppingList.objects.create(user=self.user, recipe=self.recipe)
+        response = self.get(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['is_in_shopping_cart'])
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_no_validators_without_a_shared_cache(self):
+        response = self.get('/api/tags/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
@@ -0,0 +1,66 @@
+import io
+
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+
+from api.models import Recipe
+from users.models import CustomUser
+
+
+def create_user(name):
+    return CustomUser.objects.create_user(
+        email=f'{name}@example.com', username=name, password='pw12345!',
+        first_name=name, last_name=name)
+
+
+class CounterTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.reader = create_user('reader')
+        cls.recipe = Recipe.objects.create(
+            author=cls.author, name='суп', text='суп', cooking_time=10,
+            image='recipes/photo.png')
+
+    def setUp(self):
+        self.client.force_authenticate(self.reader)
+
+    def counter(self, instance, field):
+        instance.refresh_from_db(fields=[field])
+        return getattr(instance, field)
+
+    def test_recipes_count(self):
+        self.assertEqual(self.counter(self.author, 'recipes_count'), 1)
+        self.recipe.delete()
+        self.assertEqual(self.counter(self.author, 'recipes_count'), 0)
+
+    def test_favorites_count(self):
+        url = f'/api/recipes/{self.recipe.id}/favorite/'
+        self.assertEqual(self.client.get(url).status_code, 201)
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.counter(self.recipe, 'favorites_count'), 1)
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.delete(url).status_code, 400)
+        self.assertEqual(self.counter(self.recipe, 'favorites_count'), 0)
+
+    def test_followers_count(self):
+        url = f'/api/users/{self.author.id}/subscribe/'
+        self.assertEqual(self.client.get(url).status_code, 201)
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.counter(self.author, 'followers_count'), 1)
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.counter(self.author, 'followers_count'), 0)
+
+    def test_reconcile_counters(self):
+        CustomUser.objects.filter(id=self.author.id).update(
+            recipes_count=5, followers_count=3)
+        Recipe.objects.filter(id=self.recipe.id).update(favorites_count=2)
+
+        call_command('reconcile_counters', stdout=io.StringIO())
+
+        self.assertEqual(self.counter(self.author, 'recipes_count'), 1)
+        self.assertEqual(self.counter(self.author, 'followers_count'), 0)
+        self.assertEqual(self.counter(self.recipe, 'favorites_count'), 0)
@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from api import feed
+from api.models import FeedEntry, Follow, Recipe
+from users.models import CustomUser
+
+
+def create_user(name):
+    return CustomUser.objects.create_user(
+        email=f'{name}@example.com', username=name, password='pw12345!',
+        first_name=name, last_name=name)
+
+
+def run_now(function, task, *args):
+    task(*args)
+
+
+@mock.patch.object(feed.executor, 'submit', run_now)
+@override_settings(FEED_FANOUT_MAX_FOLLOWERS=1)
+class FeedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, cls.reader, cls.other = (
+            create_user(name) for name in ('author', 'reader', 'other'))
+
+    def follow(self, user):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Follow.objects.create(user=user, author=self.author)
+
+    def publish(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Recipe.objects.create(
+                author=self.author, name='суп', text='суп', cooking_time=10,
+                image='recipes/photo.png')
+
+    def feed_ids(self, user):
+        queryset, _ = feed.get_feed(user)
+        return list(queryset.values_list('id', flat=True))
+
+    def test_fan_out_runs_in_the_executor(self):
+        self.follow(self.reader)
+        with mock.patch.object(feed.executor, 'submit') as submit:
+            recipe = self.publish()
+        submit.assert_called_once_with(feed.run, feed.fan_out, recipe.id)
+
+    def test_author_dropping_below_the_threshold(self):
+        self.follow(self.reader)
+        follow = self.follow(self.other)
+        recipe = self.publish()
+        self.assertFalse(FeedEntry.objects.exists())
+        self.assertEqual(self.feed_ids(self.reader), [recipe.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            follow.delete()
+
+        self.assertEqual(self.feed_ids(self.reader), [recipe.id])
+        self.assertEqual(list(FeedEntry.objects.values_list(
+            'user', 'recipe')), [(self.reader.id, recipe.id)])
@@ -0,0 +1,26 @@
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from api.filters import get_tag_map
+from api.models import Tag
+
+
+class TagFilterTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        Tag.objects.create(name='Завтрак', color='#E26C2D', slug='breakfast')
+
+    def test_tag_created_after_the_map_was_cached(self):
+        self.assertEqual(list(get_tag_map()), ['breakfast'])
+        Tag.objects.create(name='Обед', color='#49B64E', slug='lunch')
+
+        response = self.client.get('/api/recipes/', {'tags': 'lunch'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('lunch', get_tag_map())
+
+    def test_unknown_tag_is_rejected(self):
+        response = self.client.get('/api/recipes/', {'tags': 'dinner'})
+
+        self.assertEqual(response.status_code, 400)
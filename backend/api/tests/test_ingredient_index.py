@@ -0,0 +1,20 @@
+from django.test import TestCase
+
+from api.ingredient_index import IngredientIndex
+from api.models import Ingredient
+
+
+class IngredientIndexTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for name in ('соль', 'Соль', 'ёж', 'еж', 'сахар', 'морская соль'):
+            Ingredient.objects.create(name=name, measurement_unit='г')
+
+    def test_names_with_the_same_normalized_key(self):
+        index = IngredientIndex()
+
+        self.assertEqual([item['name'] for item in index.search('соль')],
+                         ['соль', 'Соль', 'морская соль'])
+        self.assertEqual([item['name'] for item in index.search('Еж')],
+                         ['ёж', 'еж'])
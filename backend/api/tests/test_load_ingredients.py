@@ -0,0 +1,43 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from api.models import Ingredient
+
+
+class LoadIngredientsTests(TestCase):
+
+    def load(self, items):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ingredients.json')
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(items, file, ensure_ascii=False)
+            stdout = io.StringIO()
+            call_command('load_ingredients', path, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_reports_rows_actually_written(self):
+        Ingredient.objects.create(name='соль', measurement_unit='г')
+
+        output = self.load([
+            {'title': 'соль', 'dimension': 'г'},
+            {'title': 'сахар', 'dimension': 'г'},
+            {'title': 'сахар', 'dimension': 'кг'},
+            {'title': 'мука', 'dimension': 'г'},
+        ])
+
+        self.assertIn('записано: 2', output)
+        self.assertEqual(
+            dict(Ingredient.objects.values_list('name', 'measurement_unit')),
+            {'соль': 'г', 'сахар': 'кг', 'мука': 'г'})
+
+    def test_malformed_entry(self):
+        with self.assertRaisesMessage(CommandError, 'Элемент 2'):
+            self.load([{'title': 'соль', 'dimension': 'г'},
+                       {'title': 'сахар'}])
+        self.assertFalse(Ingredient.objects.exists())
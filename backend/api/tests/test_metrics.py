@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+from django.http import HttpResponse
+from django.test import AsyncClient, SimpleTestCase, override_settings
+from django.urls import path
+
+from api.async_views import offload
+from api.metrics import registry
+
+VIEW_SECONDS = 0.3
+CONCURRENT_REQUESTS = 8
+
+
+def slow_view(request):
+    time.sleep(VIEW_SECONDS)
+    return HttpResponse('ok')
+
+
+urlpatterns = [
+    path('slow/', offload(slow_view), name='slow'),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncMetricsMiddlewareTests(SimpleTestCase):
+
+    def test_concurrent_requests_overlap(self):
+        async def fetch_all():
+            client = AsyncClient()
+            return await asyncio.gather(*(
+                client.get('/slow/') for _ in range(CONCURRENT_REQUESTS)))
+
+        started = time.perf_counter()
+        responses = asyncio.run(fetch_all())
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual([response.status_code for response in responses],
+                         [200] * CONCURRENT_REQUESTS)
+        self.assertLess(elapsed, VIEW_SECONDS * CONCURRENT_REQUESTS / 2)
+
+    def test_async_requests_are_recorded(self):
+        before = registry.requests[('slow', 'GET', 200)]
+        asyncio.run(AsyncClient().get('/slow/'))
+        self.assertEqual(registry.requests[('slow', 'GET', 200)], before + 1)
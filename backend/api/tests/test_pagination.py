@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api.models import Recipe
+from users.models import CustomUser
+
+
+class CursorPaginationTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = CustomUser.objects.create_user(
+            email='cook@example.com', username='cook', password='pw12345!',
+            first_name='cook', last_name='cook')
+        now = timezone.now()
+        cls.recipes = []
+        for number in range(5):
+            recipe = Recipe.objects.create(
+                author=author, name=f'суп {number}', text='суп',
+                cooking_time=10, image='recipes/photo.png')
+            Recipe.objects.filter(id=recipe.id).update(
+                pub_date=now - timedelta(minutes=number // 2))
+            cls.recipes.append(recipe.id)
+
+    def get_page(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data, [item['id'] for item in response.data['results']]
+
+    def test_next_and_previous(self):
+        expected = [[1, 0], [3, 2], [4]]
+        expected = [[self.recipes[i] for i in page] for page in expected]
+
+        page, ids = self.get_page('/api/recipes/', cursor='', limit=2)
+        self.assertEqual(ids, expected[0])
+        self.assertIsNone(page['previous'])
+        self.assertNotIn('count', page)
+
+        page, ids = self.get_page(page['next'])
+        self.assertEqual(ids, expected[1])
+        page, ids = self.get_page(page['next'])
+        self.assertEqual(ids, expected[2])
+        self.assertIsNone(page['next'])
+
+        page, ids = self.get_page(page['previous'])
+        self.assertEqual(ids, expected[1])
+        page, ids = self.get_page(page['previous'])
+        self.assertEqual(ids, expected[0])
+        self.assertIsNone(page['previous'])
+
+    def test_count_is_optional(self):
+        page, _ = self.get_page('/api/recipes/', cursor='', with_count='1')
+        self.assertEqual(page['count'], 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/recipes/', {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_search_is_rejected(self):
+        response = self.client.get('/api/recipes/',
+                                   {'cursor': '', 'search': 'суп'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('cursor', response.data)
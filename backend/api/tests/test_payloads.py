@@ -0,0 +1,36 @@
+import json
+
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from api.cache import touch
+from api.payloads import PrecompressedPayload
+
+
+class PrecompressedPayloadTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.data = ['соль']
+        self.payload = PrecompressedPayload('catalog',
+                                            lambda: list(self.data))
+        self.request = RequestFactory().get('/')
+
+    def get(self):
+        return json.loads(self.payload.response(self.request).content)
+
+    def test_rebuilt_when_the_stamp_changes(self):
+        self.assertEqual(self.get(), ['соль'])
+        self.data.append('сахар')
+        self.assertEqual(self.get(), ['соль'])
+
+        touch('catalog')
+
+        self.assertEqual(self.get(), ['соль', 'сахар'])
+
+    @override_settings(CATALOG_PAYLOAD_TIMEOUT=0)
+    def test_rebuilt_when_expired(self):
+        self.assertEqual(self.get(), ['соль'])
+        self.data.append('сахар')
+
+        self.assertEqual(self.get(), ['соль', 'сахар'])
@@ -0,0 +1,42 @@
+import io
+
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+
+from api.models import (Favorite, Follow, Ingredient, IngredientInRecipe,
+                        Recipe, ShoppingList, Tag)
+from users.models import CustomUser
+
+
+def create_user(name):
+    return CustomUser.objects.create_user(
+        email=f'{name}@example.com', username=name, password='pw12345!',
+        first_name=name, last_name=name)
+
+
+class RecipeCardSerializerTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.reader = create_user('reader')
+        tag = Tag.objects.create(name='Обед', color='#49B64E', slug='lunch')
+        salt = Ingredient.objects.create(name='соль', measurement_unit='г')
+        for name in ('суп', 'торт'):
+            recipe = Recipe.objects.create(
+                author=cls.author, name=name, text=name, cooking_time=10,
+                image='recipes/photo.png')
+            recipe.tags.add(tag)
+            IngredientInRecipe.objects.create(
+                recipe=recipe, ingredient=salt, amount=5)
+        Favorite.objects.create(user=cls.reader, recipe=recipe)
+        ShoppingList.objects.create(user=cls.reader, recipe=recipe)
+        ShoppingList.objects.create(user=cls.author, recipe=recipe)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def test_card_matches_the_full_serializer(self):
+        stdout = io.StringIO()
+        call_command('compare_recipe_serializers', '--repeat', '1',
+                     '--user', str(self.reader.id), '--user',
+                     str(self.author.id), stdout=stdout)
+        self.assertIn('Ответы совпадают побайтно', stdout.getvalue())
@@ -0,0 +1,30 @@
+import json
+
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from users.models import CustomUser
+
+
+class RequestSizeTests(APITestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email='cook@example.com', username='cook', password='pw12345!',
+            first_name='Иван', last_name='Петров')
+        self.client.force_authenticate(self.user)
+
+    def test_invalid_upload_content_length(self):
+        response = self.client.post(
+            '/api/recipes/images/', {}, CONTENT_LENGTH='abc')
+
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=1024)
+    def test_json_body_over_the_limit(self):
+        body = json.dumps({'name': 'суп', 'text': 'x' * 2048})
+
+        response = self.client.post('/api/recipes/', body,
+                                    content_type='application/json')
+
+        self.assertEqual(response.status_code, 413)
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core import signing
+from django.core.files.uploadhandler import (SkipFile,
+                                             TemporaryFileUploadHandler)
+
+TOKEN_SALT = 'api.recipe-image'
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+
+    def __init__(self, *args, max_size, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_size = max_size
+        self.exceeded = False
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.exceeded = True
+            self.file.close()
+            raise SkipFile()
+        return super().receive_data_chunk(raw_data, start)
+
+
+def make_image_token(name):
+    return signing.dumps(name, salt=TOKEN_SALT)
+
+
+def read_image_token(token):
+    return signing.loads(token, salt=TOKEN_SALT,
+                         max_age=settings.RECIPE_IMAGE_TOKEN_MAX_AGE)
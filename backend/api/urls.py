@@ -1,9 +1,12 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (DownloadShoppingCart, FavouriteViewSet, FollowViewSet,
-                    IngredientViewSet, RecipesViewSet, ShoppingListViewSet,
-                    TagViewSet)
+from .views import (CacheStatsView, DatabasePoolStatsView,
+                    DownloadShoppingCart, FavouriteBatchView, FavouriteViewSet,
+                    FollowViewSet, IngredientViewSet, MetricsView,
+                    RecipeImageUploadView, RecipesViewSet,
+                    ShoppingCartSummaryView, ShoppingListBatchView,
+                    ShoppingListViewSet, TagViewSet)
 
 router = DefaultRouter()
 router.register('tags', TagViewSet, basename='tags')
@@ -16,7 +19,20 @@ urlpatterns = [
          FavouriteViewSet.as_view(), name='add_recipe_to_favorite'),
     path('recipes/<int:recipe_id>/shopping_cart/',
          ShoppingListViewSet.as_view(), name='add_recipe_to_shopping_cart'),
+    path('recipes/favorite/',
+         FavouriteBatchView.as_view(), name='add_recipes_to_favorite'),
+    path('recipes/shopping_cart/',
+         ShoppingListBatchView.as_view(),
+         name='add_recipes_to_shopping_cart'),
+    path('recipes/shopping_cart/summary/',
+         ShoppingCartSummaryView.as_view(), name='shopping_cart_summary'),
+    path('recipes/images/',
+         RecipeImageUploadView.as_view(), name='upload_recipe_image'),
     path('recipes/download_shopping_cart/',
          DownloadShoppingCart.as_view(), name='dowload_shopping_cart'),
+    path('cache-stats/', CacheStatsView.as_view(), name='cache_stats'),
+    path('db-pool-stats/', DatabasePoolStatsView.as_view(),
+         name='db_pool_stats'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path('', include(router.urls))
 ]
@@ -0,0 +1,81 @@
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import cache, cart_totals
+from .models import Favorite, Recipe, ShoppingList
+
+
+def columns(model):
+    quote = connection.ops.quote_name
+    return (quote(model._meta.db_table),
+            quote(model._meta.get_field('user').column),
+            quote(model._meta.get_field('recipe').column),
+            quote(model._meta.get_field('pub_date').column))
+
+
+def placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def saved_recipe_ids(model, user, recipe_ids):
+    return set(model.objects.filter(
+        user=user, recipe_id__in=recipe_ids).values_list('recipe', flat=True))
+
+
+def execute_returning(model, user, recipe_ids, sql, params, recipe_column):
+    if connection.features.can_return_rows_from_bulk_insert:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{sql} RETURNING {recipe_column}', params)
+            return [row[0] for row in cursor.fetchall()]
+    if len(recipe_ids) == 1:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return list(recipe_ids) if cursor.rowcount else []
+    before = saved_recipe_ids(model, user, recipe_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+    after = saved_recipe_ids(model, user, recipe_ids)
+    return list(before ^ after)
+
+
+@transaction.atomic
+def add_recipes(model, user, recipe_ids):
+    table, user_column, recipe_column, date_column = columns(model)
+    recipe_table = connection.ops.quote_name(Recipe._meta.db_table)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    added = execute_returning(
+        model, user, recipe_ids,
+        f'INSERT INTO {table} ({user_column}, {recipe_column}, '
+        f'{date_column}) SELECT %s, id, %s FROM {recipe_table} '
+        f'WHERE id IN ({placeholders(recipe_ids)}) '
+        f'ON CONFLICT ({user_column}, {recipe_column}) DO NOTHING',
+        [user.id, now, *recipe_ids], recipe_column)
+    changed(model, user, added, 1)
+    return added
+
+
+@transaction.atomic
+def remove_recipes(model, user, recipe_ids):
+    table, user_column, recipe_column, _ = columns(model)
+    removed = execute_returning(
+        model, user, recipe_ids,
+        f'DELETE FROM {table} WHERE {user_column} = %s '
+        f'AND {recipe_column} IN ({placeholders(recipe_ids)})',
+        [user.id, *recipe_ids], recipe_column)
+    changed(model, user, removed, -1)
+    return removed
+
+
+def changed(model, user, recipe_ids, delta):
+    if not recipe_ids:
+        return
+    if model is Favorite:
+        Recipe.objects.filter(
+            id__in=recipe_ids, favorites_count__gte=-delta,
+        ).update(favorites_count=F('favorites_count') + delta)
+    if model is ShoppingList:
+        cart_totals.add_recipes(user.id, recipe_ids, sign=delta)
+        transaction.on_commit(cache.bump_data_version)
+    name = f'user-{user.id}'
+    transaction.on_commit(lambda: cache.touch(name))
@@ -1,47 +1,118 @@
-from django.http import HttpResponse
+from django.conf import settings
+from django.db.models import (BooleanField, Prefetch, Value,
+                              prefetch_related_objects)
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import (AllowAny, IsAdminUser,
+                                        IsAuthenticated)
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .filters import IngredientFilter, RecipeFilter
-from .models import (Favorite, Follow, Ingredient,
-                     IngredientInRecipe, Recipe, ShoppingList, Tag)
-from .paginators import PageNumberPaginatorModified
+from .cache import cached_response, get_stats
+from .conditional import conditional
+from .feed import get_feed
+from .filters import RecipeFilter, RecipeSearchFilter
+from .ingredient_index import ingredient_index
+from .metrics import registry
+from .models import Favorite, Follow, Ingredient, Recipe, ShoppingList, Tag
+from .paginators import PageNumberPaginatorModified, RecipePagination
+from .payloads import PrecompressedPayload
 from .permissions import AdminOrAuthorOrReadOnly
-from .serializers import (IngredientSerializer, TagSerializer, UserSerializer,
-                          RecipeSerializer)
+from .serializers import (IngredientSerializer, RecipeCardSerializer,
+                          RecipeIdsSerializer, RecipeImageUploadSerializer,
+                          RecipeSerializer, SubscriptionSerializer,
+                          TagSerializer)
+from .shopping_cart import FORMATS, get_buying_list
+from .uploads import LimitedUploadHandler, make_image_token
+from .user_recipes import add_recipes, remove_recipes
+from foodgram.db.postgresql_pool.base import get_stats as get_pool_stats
 from users.models import CustomUser
 
+UPLOAD_OVERHEAD = 64 * 1024
+MAX_RECIPES_LIMIT = 2 ** 31 - 1
 
+
+tag_list = PrecompressedPayload(
+    'tags', lambda: TagSerializer(Tag.objects.all(), many=True).data)
+ingredient_catalog = PrecompressedPayload(
+    'ingredients',
+    lambda: IngredientSerializer(Ingredient.objects.all(), many=True).data)
+
+
+@conditional('tags', name='list')
+@conditional('tags', name='retrieve')
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [AllowAny, ]
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format == 'json':
+            return tag_list.response(request)
+        return super().list(request, *args, **kwargs)
+
 
+@conditional('ingredients', name='list')
+@conditional('ingredients', name='retrieve')
 class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = [AllowAny, ]
-    filter_backends = [DjangoFilterBackend, ]
-    filter_class = IngredientFilter
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if name:
+            return Response(ingredient_index.search(name))
+        if request.accepted_renderer.format == 'json':
+            return ingredient_catalog.response(request)
+        return super().list(request, *args, **kwargs)
 
+
+@conditional('recipes', per_user=True, name='retrieve')
 class RecipesViewSet(viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
-    filter_backends = [DjangoFilterBackend, ]
-    filter_class = RecipeFilter
-    pagination_class = PageNumberPaginatorModified
+    filter_backends = [DjangoFilterBackend, RecipeSearchFilter]
+    filterset_class = RecipeFilter
+    pagination_class = RecipePagination
     permission_classes = [AdminOrAuthorOrReadOnly, ]
     serializer_class = RecipeSerializer
 
+    def get_queryset(self):
+        return Recipe.objects.for_user(self.request.user)
+
+    def get_serializer_class(self):
+        if self.action in ('list', 'retrieve', 'feed'):
+            return RecipeCardSerializer
+        return RecipeSerializer
+
+    def list(self, request, *args, **kwargs):
+        if not request.user.is_anonymous:
+            return super().list(request, *args, **kwargs)
+        return cached_response(
+            request, lambda: super(RecipesViewSet, self).list(
+                request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not request.user.is_anonymous:
+            return super().retrieve(request, *args, **kwargs)
+        return cached_response(
+            request, lambda: super(RecipesViewSet, self).retrieve(
+                request, *args, **kwargs))
+
+    @action(detail=False, permission_classes=[IsAuthenticated])
+    def feed(self, request):
+        queryset, self.paginator.ordering = get_feed(
+            request.user, self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
 
 class FollowViewSet(viewsets.GenericViewSet):
     queryset = CustomUser.objects.all()
@@ -49,12 +120,41 @@ class FollowViewSet(viewsets.GenericViewSet):
 
     @action(detail=False)
     def subscriptions(self, request):
-        user_qs = CustomUser.objects.filter(following__user=request.user)
-
-        paginator = PageNumberPagination()
+        recipes_limit = request.query_params.get('recipes_limit')
+        if recipes_limit is not None:
+            try:
+                recipes_limit = int(recipes_limit)
+            except ValueError:
+                recipes_limit = 0
+            if recipes_limit <= 0:
+                return Response({
+                    'message': 'recipes_limit должен быть положительным '
+                               'целым числом',
+                    'status': 'error'},
+                    status=status.HTTP_400_BAD_REQUEST)
+            recipes_limit = min(recipes_limit, MAX_RECIPES_LIMIT)
+
+        user_qs = CustomUser.objects.filter(
+            following__user=request.user,
+        ).annotate(
+            is_subscribed=Value(True, output_field=BooleanField()),
+        ).prefetch_related(
+            Prefetch('purchases', queryset=ShoppingList.objects.only(
+                'id', 'user_id')),
+        ).order_by('id')
+
+        paginator = PageNumberPaginatorModified()
         paginator.page_size = 10
         result_page = paginator.paginate_queryset(user_qs, request)
-        serializer = UserSerializer(result_page, many=True)
+
+        recipes = Recipe.objects.filter(author__in=result_page)
+        if recipes_limit is not None:
+            recipes = recipes.latest_per_author(recipes_limit)
+        prefetch_related_objects(
+            result_page, Prefetch('recipes', queryset=recipes))
+
+        serializer = SubscriptionSerializer(result_page, many=True,
+                                            context={'request': request})
 
         return paginator.get_paginated_response(serializer.data)
 
@@ -93,33 +193,30 @@ class FollowViewSet(viewsets.GenericViewSet):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
-class FavouriteViewSet(APIView):
+class UserRecipeView(APIView):
     permission_classes = (IsAuthenticated, )
+    model = None
+    exists_message = None
+    missing_message = None
 
     def get(self, request, recipe_id):
-        user = request.user
-        recipe = get_object_or_404(Recipe, id=recipe_id)
-        _, is_created = Favorite.objects.get_or_create(user=user,
-                                                       recipe=recipe)
-        if not is_created:
+        if not add_recipes(self.model, request.user, [recipe_id]):
+            get_object_or_404(Recipe, id=recipe_id)
             return Response({
-                'message': 'Вы уже добавили рецепт в избранное',
+                'message': self.exists_message,
                 'status': 'error'},
                 status=status.HTTP_400_BAD_REQUEST)
 
+        return self.created_response(request, recipe_id)
+
+    def created_response(self, request, recipe_id):
         return Response(status=status.HTTP_201_CREATED)
 
     def delete(self, request, recipe_id):
-        user = request.user
-        recipe = get_object_or_404(Recipe, id=recipe_id)
-
-        count, _ = Favorite.objects.filter(
-            recipe=recipe,
-            user=user).delete()
-
-        if count == 0:
+        if not remove_recipes(self.model, request.user, [recipe_id]):
+            get_object_or_404(Recipe, id=recipe_id)
             return Response({
-                'message': 'Рецепт не был в избранном',
+                'message': self.missing_message,
                 'status': 'error'},
                 status=status.HTTP_400_BAD_REQUEST)
 
@@ -129,73 +226,133 @@ class FavouriteViewSet(APIView):
             status=status.HTTP_204_NO_CONTENT)
 
 
-class ShoppingListViewSet(APIView):
+class UserRecipeBatchView(APIView):
     permission_classes = (IsAuthenticated, )
+    model = None
 
-    def get(self, request, recipe_id):
-        user = request.user
-        recipe = get_object_or_404(Recipe, id=recipe_id)
-        _, is_created = ShoppingList.objects.get_or_create(user=user,
-                                                           recipe=recipe)
-        if not is_created:
-            return Response({
-                'message': 'Вы уже добавили рецепт в список покупок',
-                'status': 'error'},
-                status=status.HTTP_400_BAD_REQUEST)
+    def get_recipe_ids(self, request):
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data['recipes']
 
-        serializer = RecipeSerializer(recipe)
-        return Response(
-            serializer.data,
-            status=status.HTTP_201_CREATED)
+    def post(self, request):
+        added = add_recipes(self.model, request.user,
+                            self.get_recipe_ids(request))
+        return Response({'recipes': added}, status=status.HTTP_201_CREATED)
 
-    def delete(self, request, recipe_id):
-        user = request.user
-        recipe = get_object_or_404(Recipe, id=recipe_id)
-        count, _ = ShoppingList.objects.filter(
-            recipe=recipe,
-            user=user).delete()
+    def delete(self, request):
+        removed = remove_recipes(self.model, request.user,
+                                 self.get_recipe_ids(request))
+        return Response({'recipes': removed}, status=status.HTTP_200_OK)
+
+
+class FavouriteViewSet(UserRecipeView):
+    model = Favorite
+    exists_message = 'Вы уже добавили рецепт в избранное'
+    missing_message = 'Рецепт не был в избранном'
+
+
+class FavouriteBatchView(UserRecipeBatchView):
+    model = Favorite
+
+
+class ShoppingListViewSet(UserRecipeView):
+    model = ShoppingList
+    exists_message = 'Вы уже добавили рецепт в список покупок'
+    missing_message = 'Рецепт не был в списке покупок'
+
+    def created_response(self, request, recipe_id):
+        serializer = RecipeSerializer(Recipe.objects.get(id=recipe_id))
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        if count == 0:
+
+class ShoppingListBatchView(UserRecipeBatchView):
+    model = ShoppingList
+
+
+class ShoppingCartSummaryView(APIView):
+    permission_classes = (IsAuthenticated, )
+
+    def get(self, request):
+        ingredients = list(get_buying_list(request.user))
+        return Response({'count': len(ingredients),
+                         'ingredients': ingredients})
+
+
+class RecipeImageUploadView(APIView):
+    permission_classes = (IsAuthenticated, )
+    parser_classes = (MultiPartParser, )
+
+    def post(self, request):
+        max_size = settings.RECIPE_IMAGE_MAX_SIZE
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
             return Response({
-                'message': 'Рецепт не был в списке покупок',
+                'message': 'Некорректный заголовок Content-Length',
                 'status': 'error'},
                 status=status.HTTP_400_BAD_REQUEST)
-
+        if content_length > max_size + UPLOAD_OVERHEAD:
+            return self.too_large(max_size)
+
+        handler = LimitedUploadHandler(request._request, max_size=max_size)
+        request.upload_handlers = [handler]
+        serializer = RecipeImageUploadSerializer(data=request.data)
+        if handler.exceeded:
+            return self.too_large(max_size)
+        serializer.is_valid(raise_exception=True)
+
+        upload = serializer.validated_data['image']
+        field = Recipe._meta.get_field('image')
+        name = field.storage.save(field.generate_filename(None, upload.name),
+                                  upload)
+        return Response({'image': make_image_token(name)},
+                        status=status.HTTP_201_CREATED)
+
+    def too_large(self, max_size):
         return Response({
-            'message': 'Удалено',
-            'status': 'ok'},
-            status=status.HTTP_204_NO_CONTENT)
+            'message': f'Размер фото не должен превышать {max_size} байт',
+            'status': 'error'},
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
 
 
 class DownloadShoppingCart(APIView):
     permission_classes = (IsAuthenticated, )
 
     def get(self, request):
-        user = request.user
-        shopping_cart = user.purchases.all()
-        buying_list = {}
-        for record in shopping_cart:
-            recipe = record.recipe
-            ingredients = IngredientInRecipe.objects.filter(recipe=recipe)
-            for ingredient in ingredients:
-                amount = ingredient.amount
-                name = ingredient.ingredient.name
-                measurement_unit = ingredient.ingredient.measurement_unit
-                if name not in buying_list:
-                    buying_list[name] = {
-                        'measurement_unit': measurement_unit,
-                        'amount': amount
-                    }
-                else:
-                    buying_list[name]['amount'] = (buying_list[name]['amount']
-                                                   + amount)
-
-        wishlist = []
-        for item in buying_list:
-            wishlist.append(f'{item} - {buying_list[item]["amount"]} '
-                            f'{buying_list[item]["measurement_unit"]} \n')
-        wishlist.append('\n')
-        wishlist.append('FoodGram, 2021')
-        response = HttpResponse(wishlist, 'Content-Type: text/plain')
-        response['Content-Disposition'] = 'attachment; filename="wishlist.txt"'
+        file_format = request.query_params.get('file_format', 'txt')
+        if file_format not in FORMATS:
+            return Response({
+                'message': 'Неизвестный формат файла',
+                'status': 'error'},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        render, content_type = FORMATS[file_format]
+        buying_list = get_buying_list(request.user)
+        response = StreamingHttpResponse(render(buying_list),
+                                         content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="wishlist.{file_format}"')
         return response
+
+
+class CacheStatsView(APIView):
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request):
+        return Response(get_stats())
+
+
+class DatabasePoolStatsView(APIView):
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request):
+        return Response(get_pool_stats())
+
+
+class MetricsView(APIView):
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request):
+        return HttpResponse(registry.export(),
+                            content_type='text/plain; version=0.0.4')
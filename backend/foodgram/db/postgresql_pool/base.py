@@ -0,0 +1,55 @@
+import threading
+
+from django.conf import settings
+from django.db.backends.postgresql import base
+
+from .pool import ConnectionPool
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(alias, conn_params, connect):
+    key = (alias, repr(sorted(conn_params.items())))
+    with pools_lock:
+        if key not in pools:
+            pools[key] = ConnectionPool(
+                connect,
+                max_size=settings.DB_POOL_MAX_SIZE,
+                timeout=settings.DB_POOL_TIMEOUT,
+                max_lifetime=settings.DB_POOL_MAX_LIFETIME,
+                check_interval=settings.DB_POOL_CHECK_INTERVAL,
+            )
+        return pools[key]
+
+
+def get_stats():
+    with pools_lock:
+        return {alias: pool.stats() for (alias, _), pool in pools.items()}
+
+
+def close_pools():
+    with pools_lock:
+        for pool in pools.values():
+            pool.close()
+        pools.clear()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, settings_dict, *args, **kwargs):
+        settings_dict['CONN_MAX_AGE'] = 0
+        super().__init__(settings_dict, *args, **kwargs)
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(
+            self.alias, conn_params,
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params))
+        return self.pool.acquire()
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.release(self.connection,
+                                  reuse=not self.in_atomic_block)
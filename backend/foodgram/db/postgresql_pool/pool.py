@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+
+class ConnectionPool:
+
+    def __init__(self, connect, max_size, timeout, max_lifetime,
+                 check_interval):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check_interval = check_interval
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.lock = threading.Lock()
+        self.idle = deque()
+        self.created = {}
+        self.counters = dict.fromkeys((
+            'checkouts', 'waits', 'wait_seconds', 'timeouts',
+            'connections_created', 'connections_closed',
+            'health_check_failures',
+        ), 0)
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def acquire(self):
+        if not self.slots.acquire(blocking=False):
+            started = time.monotonic()
+            acquired = self.slots.acquire(timeout=self.timeout)
+            self.count('waits')
+            self.count('wait_seconds', time.monotonic() - started)
+            if not acquired:
+                self.count('timeouts')
+                raise psycopg2.OperationalError(
+                    f'Не удалось получить соединение из пула '
+                    f'за {self.timeout} с')
+        try:
+            connection = self.checkout_idle() or self.create()
+        except Exception:
+            self.slots.release()
+            raise
+        self.count('checkouts')
+        return connection
+
+    def checkout_idle(self):
+        while True:
+            with self.lock:
+                if not self.idle:
+                    return None
+                connection, last_used = self.idle.pop()
+            if self.is_healthy(connection, last_used):
+                return connection
+            self.discard(connection)
+
+    def is_healthy(self, connection, last_used):
+        now = time.monotonic()
+        if connection.closed:
+            return False
+        if now - self.created[connection] > self.max_lifetime:
+            return False
+        if now - last_used < self.check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except psycopg2.Error:
+            self.count('health_check_failures')
+            return False
+        return True
+
+    def create(self):
+        connection = self.connect()
+        with self.lock:
+            self.created[connection] = time.monotonic()
+            self.counters['connections_created'] += 1
+        return connection
+
+    def discard(self, connection):
+        with self.lock:
+            self.created.pop(connection, None)
+            self.counters['connections_closed'] += 1
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+
+    def release(self, connection, reuse=True):
+        try:
+            reusable = reuse and not connection.closed
+            if (reusable and connection.info.transaction_status
+                    != TRANSACTION_STATUS_IDLE):
+                connection.rollback()
+        except psycopg2.Error:
+            reusable = False
+        if reusable:
+            with self.lock:
+                self.idle.append((connection, time.monotonic()))
+        else:
+            self.discard(connection)
+        self.slots.release()
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = list(self.idle), deque()
+        for connection, _ in idle:
+            self.discard(connection)
+
+    def stats(self):
+        with self.lock:
+            size = len(self.created)
+            idle = len(self.idle)
+            return {
+                'max_size': self.max_size,
+                'size': size,
+                'idle': idle,
+                'in_use': size - idle,
+                **self.counters,
+            }
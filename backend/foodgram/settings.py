@@ -15,6 +15,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'django_filters',
     'rest_framework.authtoken',
@@ -24,6 +25,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -33,7 +35,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'foodgram.urls'
+ROOT_URLCONF = os.environ.get('ROOT_URLCONF', 'foodgram.urls')
 
 TEMPLATES = [
     {
@@ -62,9 +64,36 @@ DATABASES = {
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT': os.environ.get('DB_PORT'),
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
     }
 }
 
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 16))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 5))
+DB_POOL_MAX_LIFETIME = 30 * 60
+DB_POOL_CHECK_INTERVAL = 30
+
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION', '')
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.memcached.PyMemcacheCache'
+            if CACHE_LOCATION
+            else 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': CACHE_LOCATION,
+    }
+}
+CACHE_IS_SHARED = not CACHES['default']['BACKEND'].endswith('.LocMemCache')
+CACHE_STAMP_TIMEOUT = None if CACHE_IS_SHARED else 30
+
+RECIPES_CACHE_TIMEOUT = 5 * 60
+CATALOG_PAYLOAD_TIMEOUT = 5 * 60
+
+AUTH_TOKEN_CACHE = os.environ.get('AUTH_TOKEN_CACHE')
+AUTH_TOKEN_CACHE_TIMEOUT = 30
+AUTH_TOKEN_CACHE_MAX_SIZE = 10000
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.'
@@ -93,6 +122,19 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'backend_static')
 MEDIA_URL = "/backend_media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "backend_media")
 
+INGREDIENT_SEARCH_LIMIT = 20
+
+RECIPE_IMAGE_WIDTHS = (480, 1200)
+RECIPE_IMAGE_WORKERS = 2
+RECIPE_IMAGE_MAX_SIZE = 20 * 1024 * 1024
+RECIPE_IMAGE_TOKEN_MAX_AGE = 24 * 60 * 60
+DATA_UPLOAD_MAX_MEMORY_SIZE = (
+    (RECIPE_IMAGE_MAX_SIZE + 2) // 3 * 4 + 1024 * 1024)
+
+SHOPPING_CART_PDF_FONT = os.environ.get(
+    'SHOPPING_CART_PDF_FONT',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf')
+
 
 REST_FRAMEWORK = {
     "DEFAULT_VERSIONING_CLASS":
@@ -102,8 +144,17 @@ REST_FRAMEWORK = {
 
     "ALLOWED_VERSIONS": "v1.0.0",
 
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAdminUser',
@@ -153,3 +204,19 @@ USE_I18N = True
 USE_L10N = True
 
 USE_TZ = True
+
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 10000
+
+FEED_FANOUT_MAX_FOLLOWERS = 10000
+FEED_BACKFILL_SIZE = 100
+FEED_BATCH_SIZE = 1000
+FEED_WORKERS = 2
+
+USER_RECIPES_BATCH_LIMIT = 100
+
+ASYNC_READ_WORKERS = int(os.environ.get('ASYNC_READ_WORKERS', 16))
+
+METRICS_PREFIX = 'foodgram_'
+METRICS_SLOW_REQUEST_THRESHOLD = float(
+    os.environ.get('METRICS_SLOW_REQUEST_THRESHOLD', 1))
+METRICS_SLOW_REQUEST_QUERIES = 5
@@ -0,0 +1,25 @@
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get(
+    'GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+worker_tmp_dir = '/dev/shm'
+accesslog = '-'
+
+
+def pre_fork(server, worker):
+    from django.db import connections
+
+    from foodgram.db.postgresql_pool.base import close_pools
+
+    connections.close_all()
+    close_pools()
@@ -1,10 +1,14 @@
 from django.contrib import admin
 
 from .models import CustomUser
+from api.admin import LargeTableAdmin
 
 
-class UserAdmin(admin.ModelAdmin):
-    list_filter = ('username', 'email')
+class UserAdmin(LargeTableAdmin):
+    list_display = ('username', 'email', 'first_name', 'last_name',
+                    'recipes_count', 'followers_count')
+    search_fields = ('username', 'email')
+    ordering = ('id', )
 
 
 admin.site.register(CustomUser, UserAdmin)
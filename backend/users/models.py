@@ -5,6 +5,10 @@ from django.db import models
 class CustomUser(AbstractUser):
     email = models.EmailField(
         verbose_name='email', max_length=255, unique=True)
+    recipes_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Количество рецептов')
+    followers_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Количество подписчиков')
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
     USERNAME_FIELD = 'email'
 